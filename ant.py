@@ -1,20 +1,118 @@
 import pygame
 import random
 import math
+import operator
+import numpy as np
 from parameters import COLOR
+from pathmemory import PathMemory
+from trails import TRAIL_WEIGHTS
+
+class AntSprites:
+    """
+    Cache of pre-rotated ant sprites, keyed by (carrying_food, scale, rotation bucket).
+    All rotations of a scale are rendered once, so drawing an ant is a single
+    blit and drawing a colony is a single Surface.blits call.
+    """
+    def __init__(self, rotation_step=5):
+        self.rotation_step = rotation_step  # Degrees per rotation bucket
+        self.bucket_count = int(round(360 / rotation_step))
+        self.sheets = {}  # scale -> (sprites, offset_x, offset_y), indexed by carrying * bucket_count + bucket
+
+    def _get_sheet(self, scale):
+        """Get (building on first use) every sprite of a scale"""
+        sheet = self.sheets.get(scale)
+        if sheet is None:
+            sprites = []
+            for ant_color in (COLOR.ANT, COLOR.ANT_CARRYING):
+                ant_surface = pygame.Surface((20 * scale, 7 * scale), pygame.SRCALPHA)
+                pygame.draw.ellipse(ant_surface, ant_color, (0, 0, 20 * scale, 7 * scale))
+                for bucket in range(self.bucket_count):
+                    sprites.append(pygame.transform.rotate(ant_surface, bucket * self.rotation_step))
+            # Offsets that center each sprite on the ant position
+            offset_x = np.array([sprite.get_width() // 2 for sprite in sprites])
+            offset_y = np.array([sprite.get_height() // 2 for sprite in sprites])
+            sheet = (sprites, offset_x, offset_y)
+            self.sheets[scale] = sheet
+        return sheet
+
+    def _sprite_indices(self, carrying_food, rotations):
+        """Map carrying flags and rotations in degrees to sprite indices"""
+        buckets = np.rint(np.asarray(rotations) / self.rotation_step).astype(np.int64) % self.bucket_count
+        return np.asarray(carrying_food, dtype=np.int64) * self.bucket_count + buckets
+
+    def draw(self, screen, positions, rotations, carrying_food, scale):
+        """Draw many ants at once; positions is an (n, 2) array"""
+        sprites, offset_x, offset_y = self._get_sheet(scale)
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        indices = self._sprite_indices(carrying_food, rotations)
+        left = positions[:, 0].astype(np.int64) - offset_x[indices]
+        top = positions[:, 1].astype(np.int64) - offset_y[indices]
+        screen.blits([(sprites[i], (x, y)) for i, x, y in zip(indices.tolist(), left.tolist(), top.tolist())],
+                     doreturn=False)
+
+
+# Shared by every ant and swarm
+ANT_SPRITES = AntSprites()
+
+
+class AntSpecies:
+    """
+    Behaviour constants shared by all ants of a colony.
+    Ants expose them as attributes, so setting e.g. ant.maxSpeed changes it for the whole species.
+    """
+    __slots__ = ('maxSpeed', 'steerStrength', 'viewDistance', 'viewAngle', 'pheromone_deposit_interval',
+                 'pheromone_follow_probability', 'pheromone_influence_weight', 'min_distance_to_follow',
+                 'max_path_memory', 'trail_away_weight', 'trail_strength_weight', 'trail_momentum_weight')
+
+    def __init__(self, scale=1.0):
+        # Speeds in px/s and steering in px/s^2 (7 px and 20 px/s per frame at 60 FPS)
+        self.maxSpeed = 420
+        self.steerStrength = 1200
+        self.viewDistance = 70 * scale
+        self.viewAngle = 3.14159 / 2
+        self.pheromone_deposit_interval = 0.1  # Drop pheromone every 0.1 seconds
+        self.pheromone_follow_probability = 0.85  # 85% chance to follow pheromones
+        self.pheromone_influence_weight = 0.7  # How much pheromones affect direction (increased)
+        self.min_distance_to_follow = 60  # Minimum distance from hill before following pheromones (reduced)
+        self.max_path_memory = 200  # Maximum path points to remember
+        # Trail score weights: away from the hill, pheromone strength, momentum
+        self.trail_away_weight, self.trail_strength_weight, self.trail_momentum_weight = TRAIL_WEIGHTS
+
+
+def _species_attribute(name):
+    """Ant attribute stored on its shared AntSpecies"""
+    return property(operator.attrgetter('species.' + name),
+                    lambda ant, value: setattr(ant.species, name, value))
+
 
 class Ant:
-    def __init__(self, x, y, scale=1.0, map_width=1000, map_height=1000):
+    __slots__ = ('rng', 'species', 'rotation', 'scale', 'wanderStrength', 'position', 'velocity',
+                 'desiredDirection', 'seenFood', 'carrying_food', 'food_group_id', 'ant_hill', 'map_width',
+                 'map_height', 'pheromone_manager', 'pheromone_deposit_timer', 'distance_from_hill',
+                 '_path_memory', 'path_id', 'last_pheromone_direction', 'steps_since_food')
+
+    maxSpeed = _species_attribute('maxSpeed')
+    steerStrength = _species_attribute('steerStrength')
+    viewDistance = _species_attribute('viewDistance')
+    viewAngle = _species_attribute('viewAngle')
+    pheromone_deposit_interval = _species_attribute('pheromone_deposit_interval')
+    pheromone_follow_probability = _species_attribute('pheromone_follow_probability')
+    pheromone_influence_weight = _species_attribute('pheromone_influence_weight')
+    min_distance_to_follow = _species_attribute('min_distance_to_follow')
+    max_path_memory = _species_attribute('max_path_memory')
+    trail_away_weight = _species_attribute('trail_away_weight')
+    trail_strength_weight = _species_attribute('trail_strength_weight')
+    trail_momentum_weight = _species_attribute('trail_momentum_weight')
+
+    def __init__(self, x, y, scale=1.0, map_width=1000, map_height=1000, rng=None, species=None,
+                 path_memory=None, path_id=0):
+        self.rng = rng if rng is not None else random  # random.Random instance (or the random module)
+        self.species = species if species is not None else AntSpecies(scale)
         self.rotation = 0.0
         self.scale = scale
-        self.maxSpeed = 7
-        self.steerStrength = 20
-        self.wanderStrength = 0.5
         self.position = pygame.math.Vector2(x, y)
-        self.velocity = pygame.math.Vector2(1, 0)
+        self.velocity = pygame.math.Vector2(60, 0)
         self.desiredDirection = pygame.math.Vector2(1, 0)
-        self.viewDistance = 70 * scale
-        self.viewAngle = 3.14159 / 2
         self.seenFood = None
         self.carrying_food = False
         self.food_group_id = None
@@ -23,13 +121,13 @@ class Ant:
         self.map_height = map_height
         self.pheromone_manager = None
         self.pheromone_deposit_timer = 0.0
-        self.pheromone_deposit_interval = 0.1  # Drop pheromone every 0.1 seconds
-        self.pheromone_follow_probability = 0.85  # 85% chance to follow pheromones
-        self.pheromone_influence_weight = 0.7  # How much pheromones affect direction (increased)
         self.distance_from_hill = 0.0  # Track distance traveled from ant hill
-        self.min_distance_to_follow = 60  # Minimum distance from hill before following pheromones (reduced)
-        self.path_memory = []  # Store path when finding food
-        self.max_path_memory = 200  # Maximum path points to remember
+        # Ring buffer of the path when finding food: slot path_id of a colony-wide PathMemory,
+        # or an own one-ant buffer created on first use
+        self._path_memory = path_memory
+        self.path_id = path_id
+        if path_memory is not None:
+            path_memory.clear(path_id)
         self.wanderStrength = 0.5  # Reduced wander for more focused following
         self.last_pheromone_direction = None  # Track last pheromone direction for momentum
         self.steps_since_food = 0  # Track how long since leaving ant hill
@@ -53,6 +151,26 @@ class Ant:
                 self.seenFood = foodPos
                 return
     
+    def seeFoodIndex(self, food_index, visible_food_id):
+        """
+        Same as seeFood, given the first food in the view cone as found by
+        FoodIndex.find_visible_batch (-1 when nothing is visible). When that
+        food has been eaten since the batched query, the ant looks again with
+        FoodIndex.find_visible, so it targets the next visible food like seeFood.
+        """
+        if self.carrying_food:
+            self.seenFood = None
+            return
+        
+        if visible_food_id >= 0 and not food_index.is_alive(visible_food_id):
+            visible_food_id = food_index.find_visible(self.position, self.velocity, self.viewDistance, self.viewAngle)
+            if visible_food_id is None:
+                visible_food_id = -1
+        if visible_food_id >= 0:
+            self.seenFood = food_index.get_position(visible_food_id)
+        elif self.seenFood is not None and food_index.find(self.seenFood) is None:
+            self.seenFood = None
+    
     def set_ant_hill(self, ant_hill):
         """Set the ant hill reference for this ant"""
         self.ant_hill = ant_hill
@@ -60,6 +178,23 @@ class Ant:
     def set_pheromone_manager(self, pheromone_manager):
         """Set the pheromone manager reference for this ant"""
         self.pheromone_manager = pheromone_manager
+
+    @property
+    def path_memory(self):
+        """The PathMemory holding the path (an own one-ant buffer unless a colony one was given)"""
+        if self._path_memory is None:
+            self._path_memory = PathMemory(1, self.species.max_path_memory)
+        return self._path_memory
+
+    def set_path_memory(self, path_memory, path_id):
+        """Record the path into slot path_id of a colony-wide PathMemory"""
+        self._path_memory = path_memory
+        self.path_id = path_id
+        path_memory.clear(path_id)
+
+    def get_path(self):
+        """Get the remembered path as a (length, 2) array, oldest point first"""
+        return self.path_memory.get_path(self.path_id)
     
     def pickup_food(self, group_id):
         """Pick up food and remember which group it came from"""
@@ -74,7 +209,7 @@ class Ant:
             self.ant_hill.deposit_food(self.food_group_id)
             
             # Clear path memory for next trip
-            self.path_memory.clear()
+            self.path_memory.clear(self.path_id)
             self.carrying_food = False
             self.food_group_id = None
             self.last_pheromone_direction = None
@@ -83,14 +218,27 @@ class Ant:
         return False
     
 
-    def update(self, deltaTime):
-        # Update distance from ant hill
-        if self.ant_hill:
-            self.distance_from_hill = (self.position - self.ant_hill.position).length()
+    def update(self, deltaTime, trail=None, to_hill=None, distance=None):
+        """
+        Advance the ant by one tick. `trail` is its best pheromone direction when
+        the colony scored all trails in one batch (trails.best_trail_directions):
+        a Vector2, or False when no trail qualifies. With None the ant scores the
+        nearby pheromones itself. Likewise `to_hill` and `distance` are the offset
+        (a Vector2 or an (x, y) pair) to the ant hill and its length when the
+        colony computed them in one batch.
+        """
+        species = self.species
+
+        # Offset and distance to the ant hill, computed once and shared by every step below
+        if to_hill is not None:
+            self.distance_from_hill = distance
+        elif self.ant_hill:
+            to_hill = self.ant_hill.position - self.position
+            self.distance_from_hill = to_hill.length()
         
         # Deposit pheromones at regular intervals based on state
         self.pheromone_deposit_timer += deltaTime
-        if self.pheromone_deposit_timer >= self.pheromone_deposit_interval:
+        if self.pheromone_deposit_timer >= species.pheromone_deposit_interval:
             if self.distance_from_hill > 40 and self.pheromone_manager:
                 if self.carrying_food:
                     # Deposit RED pheromone when carrying food (successful path back)
@@ -102,20 +250,18 @@ class Ant:
         
         # Record path when searching (not carrying food)
         if not self.carrying_food and self.distance_from_hill > 50:
-            # Add current position to path memory (limit size)
-            if len(self.path_memory) == 0 or (self.position - self.path_memory[-1]).length() > 10:
-                self.path_memory.append(self.position.copy())
-                if len(self.path_memory) > self.max_path_memory:
-                    self.path_memory.pop(0)  # Remove oldest
+            # Add current position to path memory (the ring buffer evicts the oldest point)
+            last = self.path_memory.last(self.path_id)
+            if last is None or math.hypot(self.position.x - last[0], self.position.y - last[1]) > 10:
+                self.path_memory.append(self.path_id, self.position.x, self.position.y)
         
         # Determine desired direction based on state and pheromones
         base_direction = pygame.math.Vector2(0, 0)
-        can_follow_pheromones = self.distance_from_hill > self.min_distance_to_follow
+        can_follow_pheromones = self.distance_from_hill > species.min_distance_to_follow
         
         # If carrying food, head back to ant hill
         if self.carrying_food and self.ant_hill:
-            toHill = self.ant_hill.position - self.position
-            base_direction = toHill.normalize()
+            base_direction = pygame.math.Vector2(to_hill).normalize()
             # Go directly home in a straight line - no steering or blending
         
         elif self.seenFood is not None:
@@ -128,17 +274,23 @@ class Ant:
             followed_pheromone = False
             self.steps_since_food += 1
             
-            if self.pheromone_manager and can_follow_pheromones and random.random() < self.pheromone_follow_probability:
+            if self.pheromone_manager and can_follow_pheromones and self.rng.random() < species.pheromone_follow_probability:
                 # Get best pheromone direction that leads AWAY from ant hill
                 best_direction = None
                 best_score = -1
                 
-                nearby_pheromones = self.pheromone_manager.get_nearby_pheromones(
-                    self.position, 'return', self.pheromone_manager.influence_radius
-                )
+                if trail is not None:
+                    # Scored in the colony-wide batch
+                    nearby_pheromones = ()
+                    if trail:
+                        best_direction, best_score = trail, 1
+                else:
+                    nearby_pheromones = self.pheromone_manager.get_nearby_pheromones(
+                        self.position, 'return', self.pheromone_manager.influence_radius
+                    )
                 
                 if nearby_pheromones and self.ant_hill:
-                    hill_direction = (self.ant_hill.position - self.position).normalize()
+                    hill_direction = pygame.math.Vector2(to_hill).normalize()
                     
                     for pheromone in nearby_pheromones:
                         to_pheromone = (pheromone.position - self.position)
@@ -156,19 +308,20 @@ class Ant:
                             # Prefer pheromones in current movement direction (momentum)
                             momentum_score = 0
                             if self.last_pheromone_direction:
-                                momentum_score = direction.dot(self.last_pheromone_direction) * 0.5
+                                momentum_score = direction.dot(self.last_pheromone_direction) * species.trail_momentum_weight
                             
                             # Combined score
-                            total_score = away_score * 2.0 + strength_score * 0.3 + momentum_score
+                            total_score = (away_score * species.trail_away_weight
+                                           + strength_score * species.trail_strength_weight + momentum_score)
                             
                             if total_score > best_score:
                                 best_score = total_score
                                 best_direction = direction
-                    
-                    if best_direction and best_score > 0:
-                        base_direction = best_direction
-                        self.last_pheromone_direction = best_direction
-                        followed_pheromone = True
+                
+                if best_direction and best_score > 0:
+                    base_direction = best_direction
+                    self.last_pheromone_direction = best_direction
+                    followed_pheromone = True
             
             # Add wandering behavior if not following pheromones
             if not followed_pheromone:
@@ -176,8 +329,8 @@ class Ant:
                 if base_direction.length() == 0:
                     base_direction = self.desiredDirection
                 
-                angle = random.uniform(0, 2 * 3.14159)
-                radius = random.uniform(0, 1)
+                angle = self.rng.uniform(0, 2 * 3.14159)
+                radius = self.rng.uniform(0, 1)
                 randomDirection = pygame.math.Vector2(radius * pygame.math.Vector2(1, 0).rotate_rad(angle))
                 base_direction = (base_direction + randomDirection * self.wanderStrength).normalize()
         
@@ -190,23 +343,22 @@ class Ant:
         # When carrying food, move in perfectly straight line to ant hill
         if self.carrying_food and self.ant_hill:
             # Set velocity directly toward ant hill for straight-line movement
-            toHill = self.ant_hill.position - self.position
-            if toHill.length() > 0:
-                self.velocity = toHill.normalize() * self.maxSpeed
+            if self.distance_from_hill > 0:
+                self.velocity = base_direction * species.maxSpeed
         else:
             # Normal steering behavior for searching ants
-            desiredVelocity = self.desiredDirection * self.maxSpeed
+            desiredVelocity = self.desiredDirection * species.maxSpeed
             desiredSteeringForce = desiredVelocity - self.velocity
             
             acceleration = pygame.math.Vector2(desiredSteeringForce)
-            if acceleration.length() > self.steerStrength:
-                acceleration.scale_to_length(self.steerStrength)
+            if acceleration.length() > species.steerStrength:
+                acceleration.scale_to_length(species.steerStrength)
             
             self.velocity += acceleration * deltaTime
-            if self.velocity.length() > self.maxSpeed:
-                self.velocity.scale_to_length(self.maxSpeed)
+            if self.velocity.length() > species.maxSpeed:
+                self.velocity.scale_to_length(species.maxSpeed)
 
-        self.position += self.velocity
+        self.position += self.velocity * deltaTime
 
         # Boundary collision detection - keep ants within map
         margin = 10  # Small margin from edge
@@ -232,27 +384,22 @@ class Ant:
 
         # Collision detection with ant hill
         if self.ant_hill:
-            distance_to_hill = (self.position - self.ant_hill.position).length()
+            direction_from_hill = self.position - self.ant_hill.position
+            distance_to_hill = direction_from_hill.length()
             # If ant is too close to hill center (but not depositing food)
             if distance_to_hill < self.ant_hill.radius:
                 # Push ant back outside the hill
-                direction_from_hill = (self.position - self.ant_hill.position)
-                if direction_from_hill.length() > 0:
+                if distance_to_hill > 0:
                     direction_from_hill = direction_from_hill.normalize()
                     self.position = self.ant_hill.position + direction_from_hill * self.ant_hill.radius
                     # Bounce velocity away from hill
-                    self.velocity = direction_from_hill * self.maxSpeed * 0.5
+                    self.velocity = direction_from_hill * species.maxSpeed * 0.5
 
         if self.velocity.length() > 0:
             self.rotation = self.velocity.angle_to(pygame.math.Vector2(1, 0))
 
     def draw(self, screen):
-        # Determine ant color based on whether it's carrying food
-        ant_color = COLOR.ANT_CARRYING if self.carrying_food else COLOR.ANT
-        
-        ant_surface = pygame.Surface((20 * self.scale, 7 * self.scale), pygame.SRCALPHA)
-        pygame.draw.ellipse(ant_surface, ant_color, (0, 0, 20 * self.scale, 7 * self.scale))
-        rotated_surface = pygame.transform.rotate(ant_surface, self.rotation)
-        rotated_rect = rotated_surface.get_rect(center=(self.position.x, self.position.y))
-        screen.blit(rotated_surface, rotated_rect.topleft)
+        # Sprite color depends on whether the ant is carrying food
+        ANT_SPRITES.draw(screen, (self.position.x, self.position.y), [self.rotation],
+                         [self.carrying_food], self.scale)
 
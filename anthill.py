@@ -1,4 +1,5 @@
 import pygame
+import numpy as np
 from parameters import COLOR
 
 class AntHill:
@@ -6,6 +7,8 @@ class AntHill:
     Mrowisko - the ant colony's nest where ants start and deposit collected food.
     Tracks statistics about food collection.
     """
+    __slots__ = ('position', 'radius', 'total_food_collected', 'food_by_group')
+
     def __init__(self, x, y, radius=30):
         self.position = pygame.math.Vector2(x, y)
         self.radius = radius
@@ -32,6 +35,20 @@ class AntHill:
             'by_group': self.food_by_group.copy()
         }
     
+    def get_state(self):
+        """Get the collection statistics as arrays (for snapshots)"""
+        group_ids = sorted(self.food_by_group)
+        return {
+            'total_food_collected': np.array(self.total_food_collected),
+            'group_ids': np.array(group_ids, dtype=np.int64),
+            'group_food': np.array([self.food_by_group[g] for g in group_ids], dtype=np.int64)
+        }
+    
+    def set_state(self, state):
+        """Restore collection statistics saved by get_state"""
+        self.total_food_collected = int(state['total_food_collected'])
+        self.food_by_group = dict(zip(state['group_ids'].tolist(), state['group_food'].tolist()))
+    
     def draw(self, screen):
         """Draw the ant hill on the screen"""
         # Draw outer circle (darker)
@@ -65,3 +82,34 @@ class AntHill:
             group_text = font.render(f"Group {color_name}: {count}", True, (0, 0, 0))
             screen.blit(group_text, (10, y_offset))
             y_offset += 25
+
+
+class HillField:
+    """
+    Nearest-hill offsets and distances for a whole colony in one pass.
+    Holds the centers and radii of one or more ant hills as arrays, so the
+    'which hill is nearest', 'how far' and 'inside' checks of every ant are
+    one vectorized computation per tick that all steps of a tick share.
+    """
+    def __init__(self, hills):
+        self.hills = list(hills)
+        self.centers = np.array([(hill.position.x, hill.position.y) for hill in self.hills], dtype=float).reshape(-1, 2)
+        self.radii = np.array([hill.radius for hill in self.hills], dtype=float)
+
+    def __len__(self):
+        return len(self.hills)
+
+    def query(self, positions):
+        """
+        Get (nearest, to_hill, distance) for an (n, 2) array of positions:
+        the index of the nearest hill, the offset from each position to that
+        hill's center and its length
+        """
+        if len(self.hills) == 1:
+            nearest = np.zeros(len(positions), dtype=np.int64)
+            to_hill = self.centers[0] - positions
+        else:
+            offsets = self.centers[None, :, :] - positions[:, None, :]
+            nearest = np.einsum('nkd,nkd->nk', offsets, offsets).argmin(axis=1)
+            to_hill = offsets[np.arange(len(positions)), nearest]
+        return nearest, to_hill, np.hypot(to_hill[:, 0], to_hill[:, 1])
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+import pygame
+from simulation import Simulation
+
+PHASES = ('pheromones', 'pickup', 'vision', 'steering', 'render')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation hot paths headless")
+    parser.add_argument('--ants', type=int, nargs='+', default=[75, 1000, 10000, 100000],
+                        help="ant counts to benchmark")
+    parser.add_argument('--food', type=int, nargs='+', default=[1500], help="total food counts to benchmark")
+    parser.add_argument('--pheromones', type=int, nargs='+', default=[0, 10000],
+                        help="number of trail pheromones placed before measuring")
+    parser.add_argument('--engines', choices=('ants', 'swarm'), nargs='+', default=['ants', 'swarm'],
+                        help="ant engines to benchmark")
+    parser.add_argument('--max-object-ants', type=int, default=2000,
+                        help="skip the per-object 'ants' engine above this many ants")
+    parser.add_argument('--ticks', type=int, default=100, help="measured ticks per case")
+    parser.add_argument('--warmup', type=int, default=10, help="unmeasured ticks before measuring")
+    parser.add_argument('--dt', type=float, default=1 / 60, help="fixed timestep in seconds")
+    parser.add_argument('--seed', type=int, default=12345, help="random seed of every case")
+    parser.add_argument('--render', action='store_true', help="also draw every tick (offscreen)")
+    parser.add_argument('--output', default='bench_output.json', help="where to write the JSON results")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="allowed ticks/sec slowdown against the baseline (0.10 = 10%%)")
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help="exit with status 1 if any case is slower than the baseline allows")
+    return parser.parse_args(argv)
+
+
+def case_name(engine, ants, food, pheromones):
+    """Stable identifier of a benchmark case, used to match baselines"""
+    return f"{engine}-ants{ants}-food{food}-pheromones{pheromones}"
+
+
+def place_trail_pheromones(simulation, count, strength, rng):
+    """Place 'return' pheromones along noisy straight trails from the hill to every food group"""
+    if count == 0:
+        return
+    hill = np.array([simulation.ant_hill.position.x, simulation.ant_hill.position.y])
+    centers = np.array([(group.center.x, group.center.y) for group in simulation.food_groups])
+    targets = centers[rng.integers(0, len(centers), count)]
+    along = rng.uniform(0, 1, count)[:, None]
+    points = hill + (targets - hill) * along + rng.normal(0, 10, (count, 2))
+    simulation.pheromone_manager.add_pheromones(points[:, 0], points[:, 1], 'return', strength=strength)
+
+
+def run_case(engine, ants, food, pheromones, args):
+    """Run one benchmark case and return its result record"""
+    simulation = Simulation(ant_count=ants, food_count=food, engine=engine, seed=args.seed)
+    # Strong enough to survive the whole case at the simulation's evaporation rate
+    duration = (args.warmup + args.ticks) * args.dt
+    strength = 3.0 + simulation.pheromone_manager.evaporation_rate * duration
+    place_trail_pheromones(simulation, pheromones, strength, np.random.default_rng(args.seed))
+
+    renderer = None
+    if args.render:
+        from renderer import Renderer
+        renderer = Renderer(simulation)
+
+    def tick():
+        simulation.step(args.dt)
+        if renderer is not None:
+            renderer.draw()
+
+    for _ in range(args.warmup):
+        tick()
+
+    simulation.profiler.enabled = True
+    simulation.profiler.reset()
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        tick()
+    elapsed = time.perf_counter() - start
+
+    totals = simulation.profiler.totals
+    return {
+        'name': case_name(engine, ants, food, pheromones),
+        'engine': engine,
+        'ants': ants,
+        'food': food,
+        'pheromones': pheromones,
+        'ticks': args.ticks,
+        'seconds': elapsed,
+        'ticks_per_sec': args.ticks / elapsed,
+        # Milliseconds per tick spent in each phase
+        'phase_ms': {phase: totals.get(phase, 0.0) * 1000 / args.ticks for phase in PHASES if phase in totals},
+        'food_collected': simulation.ant_hill.get_statistics()['total'],
+        'final_pheromones': simulation.pheromone_manager.get_count()
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print ticks/sec against a baseline, returns the names of regressed cases"""
+    previous = {result['name']: result for result in baseline['results']}
+    regressions = []
+    print(f"\n{'case':<45} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for result in results:
+        before = previous.get(result['name'])
+        if before is None:
+            print(f"{result['name']:<45} {'-':>10} {result['ticks_per_sec']:>10.1f} {'new':>7}")
+            continue
+        ratio = result['ticks_per_sec'] / before['ticks_per_sec']
+        flag = ''
+        if ratio < 1.0 - tolerance:
+            regressions.append(result['name'])
+            flag = '  REGRESSION'
+        print(f"{result['name']:<45} {before['ticks_per_sec']:>10.1f} {result['ticks_per_sec']:>10.1f} "
+              f"{ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.render:
+        # Render offscreen so benchmarks run on machines without a display
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+    results = []
+    for engine in args.engines:
+        for ants in args.ants:
+            if engine == 'ants' and ants > args.max_object_ants:
+                continue
+            for food in args.food:
+                for pheromones in args.pheromones:
+                    result = run_case(engine, ants, food, pheromones, args)
+                    phases = ', '.join(f"{phase} {ms:.2f}" for phase, ms in result['phase_ms'].items())
+                    print(f"{result['name']:<45} {result['ticks_per_sec']:>9.1f} ticks/sec  (ms/tick: {phases})")
+                    results.append(result)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'ticks': args.ticks,
+            'warmup': args.warmup,
+            'dt': args.dt,
+            'seed': args.seed,
+            'render': args.render
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,8 @@
 import pygame
 import random
 import math
+import heapq
+import numpy as np
 from parameters import COLOR
 
 class FoodGroup:
@@ -8,31 +10,73 @@ class FoodGroup:
     Represents a cluster/group of food items positioned together.
     This allows organizing food into distinct areas for ACO algorithm preparation.
     """
-    def __init__(self, group_id, center_x, center_y, food_count, spread_radius=50):
+    __slots__ = ('group_id', 'center', 'spread_radius', 'food_items', 'food_ids', 'count', 'bounding_radius',
+                 'bounds_heap', 'color')
+
+    def __init__(self, group_id, center_x, center_y, food_count, spread_radius=50, rng=None):
         self.group_id = group_id
         self.center = pygame.math.Vector2(center_x, center_y)
         self.spread_radius = spread_radius
-        self.food_items = []
+        self.food_items = {}  # Item id -> position, in creation order
+        self.food_ids = {}  # (x, y) -> item id, for O(1) removal by position
+        self.count = 0  # Live number of remaining items
+        # Distance from the center to the farthest remaining item, kept up to date
+        # with a lazy max-heap of (-distance, item id) so it shrinks as food is taken
+        self.bounding_radius = 0.0
+        self.bounds_heap = []
         self.color = COLOR.FOOD_GROUPS[group_id % len(COLOR.FOOD_GROUPS)]
         
         # Generate food items around the center
-        for _ in range(food_count):
+        rng = rng if rng is not None else random
+        for food_id in range(food_count):
             # Random position within spread radius
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(0, spread_radius)
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(0, spread_radius)
             offset_x = distance * math.cos(angle)
             offset_y = distance * math.sin(angle)
             
-            food_pos = pygame.math.Vector2(center_x + offset_x, center_y + offset_y)
-            self.food_items.append(food_pos)
+            self.add_food(food_id, center_x + offset_x, center_y + offset_y)
+    
+    def add_food(self, food_id, x, y):
+        """Add a food item with the given id"""
+        food_pos = pygame.math.Vector2(x, y)
+        self.food_items[food_id] = food_pos
+        self.food_ids[(food_pos.x, food_pos.y)] = food_id
+        self.count += 1
+        distance = food_pos.distance_to(self.center)
+        heapq.heappush(self.bounds_heap, (-distance, food_id))
+        self.bounding_radius = max(self.bounding_radius, distance)
+        return food_pos
+
+    def clear(self):
+        """Remove all food items"""
+        self.food_items.clear()
+        self.food_ids.clear()
+        self.count = 0
+        self.bounding_radius = 0.0
+        self.bounds_heap = []
     
     def remove_food(self, position):
-        """Remove a food item at the given position"""
-        for food_pos in self.food_items:
-            if (food_pos - position).length() < 1:  # Close enough
-                self.food_items.remove(food_pos)
-                return True
-        return False
+        """Remove the food item at exactly the given position (as returned by get_all_positions)"""
+        food_id = self.food_ids.get((position[0], position[1]))
+        if food_id is None:
+            return False
+        return self.remove_food_id(food_id)
+    
+    def remove_food_id(self, food_id):
+        """Remove a food item by its id"""
+        food_pos = self.food_items.pop(food_id, None)
+        if food_pos is None:
+            return False
+        del self.food_ids[(food_pos.x, food_pos.y)]
+        self.count -= 1
+
+        # Shrink the bounds once the farthest item is gone
+        heap = self.bounds_heap
+        while heap and heap[0][1] not in self.food_items:
+            heapq.heappop(heap)
+        self.bounding_radius = -heap[0][0] if heap else 0.0
+        return True
     
     def get_nearest_food(self, position, max_distance=None):
         """Find the nearest food item to a given position"""
@@ -42,7 +86,7 @@ class FoodGroup:
         nearest = None
         min_distance = float('inf')
         
-        for food_pos in self.food_items:
+        for food_pos in self.food_items.values():
             distance = (food_pos - position).length()
             if distance < min_distance:
                 if max_distance is None or distance <= max_distance:
@@ -53,19 +97,73 @@ class FoodGroup:
     
     def is_empty(self):
         """Check if all food has been collected"""
-        return len(self.food_items) == 0
+        return self.count == 0
     
     def get_food_count(self):
         """Get the number of remaining food items"""
-        return len(self.food_items)
-    
+        return self.count
+
     def draw(self, screen, scale=1.0):
         """Draw all food items in this group"""
-        for food_pos in self.food_items:
+        for food_pos in self.food_items.values():
             pygame.draw.circle(screen, self.color, 
                              (int(food_pos.x), int(food_pos.y)), 
                              int(5 * scale))
     
     def get_all_positions(self):
-        """Get all food positions (for ant vision)"""
-        return self.food_items.copy()
+        """Get a live view of all food positions (for ant vision), without copying"""
+        return self.food_items.values()
+
+
+class ActiveFoodGroups:
+    """
+    Registry of the food groups that still have food.
+    Keeps the centers and bounding radii of the active groups as arrays, so
+    a whole colony can be tested against every group at once. Empty groups
+    are dropped and bounds shrink as food is taken, so the broad-phase gets
+    cheaper over a run.
+    """
+    def __init__(self, groups=()):
+        self.groups = []
+        self.centers = np.empty((0, 2))
+        self.radii = np.empty(0)
+        for group in groups:
+            self.add(group)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def _rebuild(self):
+        """Rebuild the bounds arrays after groups were added or dropped"""
+        self.centers = np.array([(group.center.x, group.center.y) for group in self.groups]).reshape(-1, 2)
+        self.radii = np.array([group.bounding_radius for group in self.groups])
+
+    def add(self, group):
+        """Register a group, if it has food"""
+        if not group.is_empty() and group not in self.groups:
+            self.groups.append(group)
+            self._rebuild()
+
+    def update(self, group):
+        """Refresh the bounds of a group after food was taken, dropping it once empty"""
+        if group not in self.groups:
+            return
+        if group.is_empty():
+            self.groups.remove(group)
+            self._rebuild()
+        else:
+            self.radii[self.groups.index(group)] = group.bounding_radius
+
+    def overlapping(self, positions, radius):
+        """Mask of the (n, 2) positions whose circle of radius (scalar or per position) touches any active group"""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if not self.groups:
+            return np.zeros(len(positions), dtype=bool)
+        # Tiny slack so rounding never culls an item lying exactly on the bounds
+        reach = self.radii + np.reshape(radius, (-1, 1)) + 1e-6
+        dx = positions[:, 0, None] - self.centers[:, 0]
+        dy = positions[:, 1, None] - self.centers[:, 1]
+        return (dx * dx + dy * dy <= reach * reach).any(axis=1)
@@ -0,0 +1,244 @@
+import pygame
+import math
+import numpy as np
+from foodgroup import ActiveFoodGroups
+
+class FoodIndex:
+    """
+    Uniform grid over the food items of all food groups.
+    Every food item gets a global integer id, assigned group by group in item
+    order, so "the lowest visible id" is the same food a scan over the groups
+    would find first. Ids map to their group and position in O(1) and removal
+    is O(1), so ants never scan or copy whole food lists.
+
+    The grid is stored CSR-style: food ids sorted by cell plus the start offset
+    of every cell. Removal only clears the alive flag, so the grid is rebuilt
+    only when food is added. Queries first check the bounds of the groups that
+    still have food (see ActiveFoodGroups), so ants far from any remaining
+    food skip the grid entirely.
+    """
+    def __init__(self, food_groups, cell_size=50):
+        self.cell_size = max(1.0, float(cell_size))
+        self.groups = {}
+        self.active_groups = ActiveFoodGroups()
+        self.positions = []  # id -> pygame.math.Vector2
+        self.group_ids = np.empty(0, dtype=np.int64)  # id -> owning group id
+        self.local_ids = []  # id -> key of the item inside its group
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.alive = np.empty(0, dtype=bool)  # id -> False once eaten
+        self.ids_by_position = {}  # (x, y) -> id of live food
+        self.count = 0
+        self.candidates_checked = 0  # (ant, food) pairs tested by find_visible_batch, for profiling
+
+        for group in food_groups:
+            self.add_group(group)
+
+    def add_group(self, group):
+        """Index all remaining food items of a group"""
+        self.groups[group.group_id] = group
+        self.active_groups.add(group)
+        items = list(group.food_items.items())
+        first_id = len(self.positions)
+        for offset, (local_id, position) in enumerate(items):
+            self.positions.append(position)
+            self.local_ids.append(local_id)
+            self.ids_by_position[(position.x, position.y)] = first_id + offset
+
+        added = len(items)
+        self.group_ids = np.concatenate((self.group_ids, np.full(added, group.group_id, dtype=np.int64)))
+        self.x = np.concatenate((self.x, [position.x for _, position in items]))
+        self.y = np.concatenate((self.y, [position.y for _, position in items]))
+        self.alive = np.concatenate((self.alive, np.ones(added, dtype=bool)))
+        self.count += added
+        self._build_grid()
+
+    def get_state(self):
+        """Get every indexed food item, eaten or not, as arrays (for snapshots)"""
+        return {
+            'x': self.x.copy(),
+            'y': self.y.copy(),
+            'group_ids': self.group_ids.copy(),
+            'local_ids': np.array(self.local_ids, dtype=np.int64),
+            'alive': self.alive.copy()
+        }
+
+    def set_state(self, state):
+        """
+        Restore food saved by get_state, keeping every global id.
+        The indexed groups get exactly the remaining items back.
+        """
+        for group in self.groups.values():
+            group.clear()
+
+        self.x = state['x'].copy()
+        self.y = state['y'].copy()
+        self.group_ids = state['group_ids'].copy()
+        self.local_ids = state['local_ids'].tolist()
+        self.alive = state['alive'].copy()
+        self.positions = []
+        self.ids_by_position = {}
+        for food_id, (x, y, group_id, local_id, alive) in enumerate(zip(
+                self.x.tolist(), self.y.tolist(), self.group_ids.tolist(), self.local_ids, self.alive.tolist())):
+            if alive:
+                position = self.groups[group_id].add_food(local_id, x, y)
+                self.ids_by_position[(position.x, position.y)] = food_id
+            else:
+                position = pygame.math.Vector2(x, y)
+            self.positions.append(position)
+        self.count = int(self.alive.sum())
+        self.active_groups = ActiveFoodGroups(self.groups.values())
+        self._build_grid()
+
+    def _build_grid(self):
+        """Sort all food ids by grid cell"""
+        cell_x = np.floor(self.x / self.cell_size).astype(np.int64)
+        cell_y = np.floor(self.y / self.cell_size).astype(np.int64)
+        if len(cell_x):
+            self.origin_x, self.origin_y = int(cell_x.min()), int(cell_y.min())
+            self.cols = int(cell_x.max()) - self.origin_x + 1
+            self.rows = int(cell_y.max()) - self.origin_y + 1
+        else:
+            self.origin_x = self.origin_y = 0
+            self.cols = self.rows = 0
+        cells = (cell_y - self.origin_y) * self.cols + (cell_x - self.origin_x)
+
+        # A stable sort keeps ids ascending inside every cell
+        self.cell_ids = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=self.rows * self.cols)
+        self.cell_starts = np.concatenate(([0], np.cumsum(counts)))
+
+    def _cell_of(self, x, y):
+        """Get the grid cell containing a point"""
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def find(self, position):
+        """Get the id of the live food at exactly this position, or None"""
+        return self.ids_by_position.get((position[0], position[1]))
+
+    def get_position(self, food_id):
+        """Get the position of a food item"""
+        return self.positions[food_id]
+
+    def get_group_id(self, food_id):
+        """Get the id of the group owning a food item"""
+        return int(self.group_ids[food_id])
+
+    def is_alive(self, food_id):
+        """Check if a food item has not been eaten yet"""
+        return bool(self.alive[food_id])
+
+    def remove(self, food_id):
+        """Remove a food item from the index and its group, returns the group id"""
+        if not self.alive[food_id]:
+            return None
+        position = self.positions[food_id]
+        self.alive[food_id] = False
+        del self.ids_by_position[(position.x, position.y)]
+        self.count -= 1
+
+        group_id = int(self.group_ids[food_id])
+        group = self.groups[group_id]
+        group.remove_food_id(self.local_ids[food_id])
+        self.active_groups.update(group)
+        return group_id
+
+    def query(self, position, radius):
+        """Get ids of all live food within a radius"""
+        px, py = position[0], position[1]
+        if not self.active_groups.overlapping((px, py), radius)[0]:
+            return []
+        radius_sq = radius * radius
+        min_x, min_y = self._cell_of(px - radius, py - radius)
+        max_x, max_y = self._cell_of(px + radius, py + radius)
+        min_x, max_x = max(min_x, self.origin_x), min(max_x, self.origin_x + self.cols - 1)
+        min_y, max_y = max(min_y, self.origin_y), min(max_y, self.origin_y + self.rows - 1)
+
+        nearby = []
+        for cell_y in range(min_y, max_y + 1):
+            for cell_x in range(min_x, max_x + 1):
+                cell = (cell_y - self.origin_y) * self.cols + (cell_x - self.origin_x)
+                for food_id in self.cell_ids[self.cell_starts[cell]:self.cell_starts[cell + 1]].tolist():
+                    if self.alive[food_id]:
+                        food = self.positions[food_id]
+                        dx, dy = food.x - px, food.y - py
+                        if dx * dx + dy * dy <= radius_sq:
+                            nearby.append(food_id)
+        return nearby
+
+    def find_visible(self, position, velocity, view_distance, view_angle):
+        """
+        Get the lowest id of live food within view_distance inside the view cone
+        around velocity, or None. The cone test compares a dot product against
+        cos(view_angle / 2) instead of computing angles.
+        """
+        px, py = position[0], position[1]
+        vx, vy = velocity[0], velocity[1]
+        speed = math.hypot(vx, vy)
+        cos_half_angle = math.cos(view_angle / 2)
+        best = None
+        for food_id in self.query(position, view_distance):
+            if best is not None and food_id > best:
+                continue
+            food = self.positions[food_id]
+            dx, dy = food.x - px, food.y - py
+            if dx * vx + dy * vy > cos_half_angle * math.hypot(dx, dy) * speed:
+                best = food_id
+        return best
+
+    def find_visible_batch(self, positions, velocities, view_distance, view_angle, chunk_size=16384):
+        """
+        Vectorized find_visible for many ants at once.
+        positions and velocities are (n, 2) arrays; view_distance may be a scalar
+        or one value per ant. Returns an (n,) array with the lowest visible food
+        id per ant, or -1 where an ant sees nothing.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        velocities = np.asarray(velocities, dtype=float).reshape(-1, 2)
+        n = len(positions)
+        view_distance = np.broadcast_to(np.asarray(view_distance, dtype=float), (n,))
+        if n == 0 or self.count == 0:
+            return np.full(n, -1, dtype=np.int64)
+
+        # Every ant checks the block of cells its view distance can reach
+        reach = int(math.ceil(view_distance.max() / self.cell_size))
+        offset_x, offset_y = np.meshgrid(np.arange(-reach, reach + 1), np.arange(-reach, reach + 1))
+        offset_x, offset_y = offset_x.ravel(), offset_y.ravel()
+        cos_half_angle = math.cos(view_angle / 2)
+        no_food = len(self.positions)
+        lowest = np.full(n, no_food, dtype=np.int64)
+        # Broad-phase: only ants whose view reaches a group with food left
+        near = np.flatnonzero(self.active_groups.overlapping(positions, view_distance))
+
+        for start in range(0, len(near), chunk_size):
+            ants = near[start:start + chunk_size]
+            px, py = positions[ants, 0], positions[ants, 1]
+            cell_x = np.floor(px / self.cell_size).astype(np.int64)[:, None] + offset_x - self.origin_x
+            cell_y = np.floor(py / self.cell_size).astype(np.int64)[:, None] + offset_y - self.origin_y
+            inside = (cell_x >= 0) & (cell_x < self.cols) & (cell_y >= 0) & (cell_y < self.rows)
+            cells = np.where(inside, cell_y * self.cols + cell_x, 0)
+            counts = np.where(inside, self.cell_starts[cells + 1] - self.cell_starts[cells], 0).ravel()
+            total = int(counts.sum())
+            self.candidates_checked += total
+            if total == 0:
+                continue
+
+            # Expand every (ant, cell) pair into one (ant, food) candidate pair
+            pair_ant = np.repeat(np.repeat(ants, len(offset_x)), counts)
+            pair_first = np.repeat(np.cumsum(counts) - counts, counts)
+            pair_start = np.repeat(self.cell_starts[cells.ravel()], counts)
+            food = self.cell_ids[pair_start + np.arange(total) - pair_first]
+
+            # Distance + cone test
+            dx = self.x[food] - positions[pair_ant, 0]
+            dy = self.y[food] - positions[pair_ant, 1]
+            vx, vy = velocities[pair_ant, 0], velocities[pair_ant, 1]
+            distance_sq = dx * dx + dy * dy
+            reach_sq = view_distance[pair_ant] ** 2
+            dot = dx * vx + dy * vy
+            visible = self.alive[food] & (distance_sq <= reach_sq) & \
+                (dot > cos_half_angle * np.sqrt(distance_sq) * np.hypot(vx, vy))
+            # Lowest visible id per ant
+            np.minimum.at(lowest, pair_ant[visible], food[visible])
+
+        return np.where(lowest < no_food, lowest, -1)
@@ -0,0 +1,142 @@
+import numpy as np
+
+def _ticks_until_due(timer, deltaTime, interval):
+    """Count the ticks until a pheromone deposit timer starting at `timer` is due (same float steps as Ant.update)"""
+    ticks = 0
+    while True:
+        ticks += 1
+        timer += deltaTime
+        if timer >= interval:
+            return ticks
+
+
+class HomingTrips:
+    """
+    Closed-form return trips of food-carrying ants.
+    A carrying ant walks to its hill in a straight line at full speed, so its
+    whole trip follows from where it starts: after e ticks it is at
+    start + e * step, it reaches the hill on a tick known in advance and it
+    drops a 'return' pheromone every `period` ticks after its first deposit.
+    Trips of the whole colony live in arrays indexed by ant id (like
+    PathMemory), so advancing every returning ant is a few array operations
+    per tick instead of one Ant.update call each.
+    """
+    STATE = ('active', 'start', 'step', 'elapsed', 'arrival', 'first_deposit', 'period',
+             'end', 'end_velocity', 'end_timer', 'end_distance')
+
+    def __init__(self, count):
+        self.active = np.zeros(count, dtype=bool)
+        self.start = np.zeros((count, 2))
+        self.step = np.zeros((count, 2))  # Movement per tick
+        self.elapsed = np.zeros(count, dtype=np.int64)  # Ticks travelled so far
+        self.arrival = np.zeros(count, dtype=np.int64)  # Elapsed ticks when the ant is at the hill
+        self.first_deposit = np.zeros(count, dtype=np.int64)  # Elapsed ticks at the first pheromone drop
+        self.period = np.ones(count, dtype=np.int64)  # Ticks between pheromone drops
+        # State of the ant on arrival: position (pushed out of the hill), velocity, deposit timer
+        # and the hill distance seen by its last update
+        self.end = np.zeros((count, 2))
+        self.end_velocity = np.zeros((count, 2))
+        self.end_timer = np.zeros(count)
+        self.end_distance = np.zeros(count)
+
+    def __len__(self):
+        return len(self.active)
+
+    def begin(self, i, position, hill, hill_radius, speed, deltaTime, timer, interval, arrive_distance=50):
+        """
+        Start the trip of ant i from position to the hill centre, moving speed * deltaTime
+        per tick with its pheromone deposit timer at `timer`. The ant arrives on the
+        first tick it is closer than arrive_distance to the hill.
+        Returns the arrival tick, or None without starting a trip when the ant does not
+        move or a step is as wide as the arrival disk: a straight walk could then step
+        over the disk, while Ant.update re-aims at the hill every tick.
+        """
+        if deltaTime <= 0 or not 0 < speed * deltaTime < 2 * arrive_distance:
+            return None
+        start = np.array(position, dtype=float)
+        hill = np.array(hill, dtype=float)
+        offset = hill - start
+        distance = float(np.hypot(*offset))
+        direction = offset / distance
+        step = direction * speed * deltaTime
+
+        def distance_after(ticks):
+            return float(np.hypot(*(hill - (start + ticks * step))))
+
+        # Closed-form arrival, corrected by a tick where rounding puts it off by one
+        arrival = max(1, int((distance - arrive_distance) // np.hypot(*step)) + 1)
+        while arrival > 1 and distance_after(arrival - 1) < arrive_distance:
+            arrival -= 1
+        while distance_after(arrival) >= arrive_distance:
+            arrival += 1
+
+        # The last move may end inside the hill, which pushes the ant back to its edge
+        end = start + arrival * step
+        velocity = direction * speed
+        from_hill = end - hill
+        end_distance = float(np.hypot(*from_hill))
+        if 0 < end_distance < hill_radius:
+            from_hill /= end_distance
+            end = hill + from_hill * hill_radius
+            velocity = from_hill * speed * 0.5
+
+        first = _ticks_until_due(timer, deltaTime, interval)
+        period = _ticks_until_due(0.0, deltaTime, interval)
+        # Deposit timer after `arrival` updates, reset whenever it was due
+        if arrival < first:
+            ticks = arrival
+        else:
+            timer, ticks = 0.0, (arrival - first) % period
+        for _ in range(ticks):
+            timer += deltaTime
+
+        self.active[i] = True
+        self.start[i] = start
+        self.step[i] = step
+        self.elapsed[i] = 0
+        self.arrival[i] = arrival
+        self.first_deposit[i] = first - 1
+        self.period[i] = period
+        self.end[i] = end
+        self.end_velocity[i] = velocity
+        self.end_timer[i] = timer
+        self.end_distance[i] = distance_after(arrival - 1)
+        return arrival
+
+    def arrived(self):
+        """Get the ids of ants whose trip has reached the hill"""
+        return np.flatnonzero(self.active & (self.elapsed >= self.arrival))
+
+    def finish(self, i):
+        """End the trip of ant i, returns its (position, velocity, deposit timer, hill distance) on arrival"""
+        self.active[i] = False
+        return (self.end[i].tolist(), self.end_velocity[i].tolist(), float(self.end_timer[i]),
+                float(self.end_distance[i]))
+
+    def advance(self):
+        """
+        Move every travelling ant by one tick.
+        Returns the (n, 2) positions of this tick's pheromone drops (taken before
+        moving, like Ant.update) and the ids and new positions of the moved ants.
+        """
+        ids = np.flatnonzero(self.active)
+        elapsed = self.elapsed[ids]
+        since_first = elapsed - self.first_deposit[ids]
+        due = (since_first >= 0) & (since_first % self.period[ids] == 0)
+        drops = self.start[ids[due]] + elapsed[due, None] * self.step[ids[due]]
+
+        elapsed += 1
+        self.elapsed[ids] = elapsed
+        positions = self.start[ids] + elapsed[:, None] * self.step[ids]
+        home = elapsed >= self.arrival[ids]
+        positions[home] = self.end[ids[home]]
+        return drops, ids, positions
+
+    def get_state(self):
+        """Get all trips as arrays (for snapshots)"""
+        return {'trip_' + name: getattr(self, name).copy() for name in self.STATE}
+
+    def set_state(self, state):
+        """Restore trips saved by get_state"""
+        for name in self.STATE:
+            setattr(self, name, state['trip_' + name].copy())
@@ -1,144 +1,91 @@
-import pygame
+import argparse
 import sys
-import random
-import math
-from ant import Ant
-from anthill import AntHill
-from foodgroup import FoodGroup
-from pheromone import PheromoneManager
-from parameters import COLOR
-
-pygame.init()
-
-WIDTH = 1000
-HEIGHT = 1000
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Ant Simulation")
-
-# Font for statistics
-font = pygame.font.Font(None, 24)
-
-clock = pygame.time.Clock()
-
-running = True
-
-scale = 0.5
-antCount = 75
-foodCount = 1500
-
-# Create the ant hill (mrowisko) close to center but asymmetric
-ant_hill = AntHill(WIDTH // 2 + 80, HEIGHT // 2 - 60, radius=40)
-
-# Create pheromone manager
-pheromone_manager = PheromoneManager(evaporation_rate=1, influence_radius=80)
-
-# Create ants at the ant hill location with highly asymmetric initial states
-ants = [Ant(WIDTH // 2 + 80, HEIGHT // 2 - 60, scale, WIDTH, HEIGHT) for _ in range(antCount)]
-for i, ant in enumerate(ants):
-    ant.set_ant_hill(ant_hill)
-    ant.set_pheromone_manager(pheromone_manager)
-    
-    # Highly asymmetric initialization
-    # Use different random distributions for each ant
-    random_angle = random.gauss(0, 3)  # Gaussian distribution for angle clustering
-    random_speed = random.triangular(ant.maxSpeed * 0.3, ant.maxSpeed * 1.2, ant.maxSpeed * 0.6)
-    
-    # Add chaos with prime number offset for each ant
-    chaos_offset = (i * 37) % 360  # Prime-based offset
-    random_angle += math.radians(chaos_offset)
-    
-    ant.velocity = pygame.math.Vector2(
-        random_speed * math.cos(random_angle),
-        random_speed * math.sin(random_angle)
-    )
-    ant.desiredDirection = ant.velocity.normalize()
-    
-    # Highly varied rotation
-    ant.rotation = random.gauss(0, 120)
-    
-    # Randomize wander strength per ant for different exploration patterns
-    ant.wanderStrength = random.uniform(0.2, 1.5)
-
-# Create 5 food groups asymmetrically placed on the map
-# Anthill is at (580, 440)
-food_groups = []
-food_per_group = foodCount // 5
-
-# Group Green: Close to anthill, upper-left
-food_groups.append(FoodGroup(0, 380, 280, food_per_group, spread_radius=80))
-
-# Group Red: Far, top-right area
-food_groups.append(FoodGroup(1, WIDTH - 180, 200, food_per_group, spread_radius=80))
-
-# Group Blue: Medium distance, left side
-food_groups.append(FoodGroup(2, 200, HEIGHT - 300, food_per_group, spread_radius=80))
-
-# Group Yellow: Close to anthill, right side
-food_groups.append(FoodGroup(3, 750, 520, food_per_group, spread_radius=80))
-
-# Group Purple: Far, bottom area
-food_groups.append(FoodGroup(4, WIDTH // 2 - 100, HEIGHT - 120, food_per_group, spread_radius=80))
-
-clock = pygame.time.Clock()
-
-while running:
-    deltaTime = clock.tick(60) / 1000.0
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    screen.fill(COLOR.GROUND)
-
-    # Update pheromones (evaporation)
-    pheromone_manager.update(deltaTime)
-
-    # Draw pheromones first (behind everything)
-    pheromone_manager.draw(screen, scale)
-
-    # Draw the ant hill first (so it appears behind ants)
-    ant_hill.draw(screen)
-
-    # Collect all food positions from all groups for ant vision
-    # Update and draw ants
-    for ant in ants:
-        # Check if ant reached food (increased collision radius)
-        if not ant.carrying_food and ant.seenFood is not None:
-            for group in food_groups:
-                if ant.seenFood in group.get_all_positions():
-                    if (ant.position - ant.seenFood).length() < 15:  # Increased from 5 to 15
-                        group.remove_food(ant.seenFood)
-                        ant.pickup_food(group.group_id)
-                        break
-        
-        # Check if ant carrying food reached the ant hill
-        if ant.carrying_food and ant_hill.is_inside(ant.position, distance_threshold=50):
-            ant.deposit_food()
-        
-        # Only collect food positions from nearby groups (within vision range)
-        nearby_food = []
-        vision_range = ant.viewDistance + 100  # Add buffer to check slightly beyond view distance
-        for group in food_groups:
-            # Quick distance check to group center
-            dist_to_group = (ant.position - group.center).length()
-            if dist_to_group < vision_range + group.spread_radius:
-                nearby_food.extend(group.get_all_positions())
-        
-        # Update ant behavior with only nearby food
-        ant.seeFood(nearby_food)
-        ant.update(deltaTime)
-        ant.draw(screen)
-
-    # Draw all food groups
-    for group in food_groups:
-        group.draw(screen, scale)
-    
-    # Draw statistics
-    ant_hill.draw_statistics(screen, font)
-
-    pygame.display.flip()
-    
-    clock.tick(60)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+import time
+from simulation import Simulation
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ant Simulation")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a window for a fixed number of ticks and report ticks/sec")
+    parser.add_argument('--ticks', type=int, default=1000, help="number of ticks to run headless")
+    parser.add_argument('--dt', type=float, default=1 / 60, help="fixed timestep in seconds for headless runs")
+    parser.add_argument('--ants', type=int, default=75, help="number of ants")
+    parser.add_argument('--food', type=int, default=1500, help="total number of food items")
+    # Pheromone backend: 'points' keeps individual markers, 'field' uses a fixed-resolution grid
+    parser.add_argument('--pheromones', choices=('points', 'field'), default='points',
+                        help="pheromone backend")
+    parser.add_argument('--merge-radius', type=float, default=0,
+                        help="merge 'points' pheromone deposits this close to an existing marker into it (0: off)")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for a reproducible run")
+    parser.add_argument('--engine', choices=('ants', 'swarm'), default='ants',
+                        help="per-ant objects or the vectorized swarm engine")
+    parser.add_argument('--fps', type=int, default=60, help="display frame rate of the window")
+    parser.add_argument('--tick-rate', type=int, default=60,
+                        help="simulation ticks per simulated second in the window (fixed timestep)")
+    parser.add_argument('--speed', type=float, default=1.0, help="simulated seconds per real second in the window")
+    parser.add_argument('--fast-forward', type=int, default=8,
+                        help="speed multiplier while fast-forward is on (toggle with F)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="step the swarm engine in map tiles across this many worker processes")
+    parser.add_argument('--record', metavar='PATH', help="stream telemetry frames of the run to PATH (play back with replay.py)")
+    parser.add_argument('--record-every', type=int, default=10, help="ticks between recorded frames")
+    parser.add_argument('--record-block', action='store_true',
+                        help="wait for the disk instead of dropping frames when the recorder falls behind")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every phase; shows a live overlay (toggle with F3) or a summary when headless")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="write a Chrome trace (chrome://tracing, Perfetto) of all phases to PATH")
+    return parser.parse_args(argv)
+
+
+def run_headless(simulation, ticks, deltaTime):
+    """Run the simulation without rendering and print ticks/sec"""
+    start = time.perf_counter()
+    simulation.run(ticks, deltaTime)
+    elapsed = time.perf_counter() - start
+
+    stats = simulation.ant_hill.get_statistics()
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:.1f} ticks/sec)")
+    print(f"Total food: {stats['total']}, by group: {stats['by_group']}, "
+          f"pheromones: {simulation.pheromone_manager.get_count()}")
+
+    if simulation.profiler.enabled:
+        stats = simulation.profiler.get_stats()
+        print(f"Last {len(simulation.profiler.history)} ticks:")
+        for name, values in stats['phases'].items():
+            print(f"  {name:<28} {values['mean_ms']:8.3f} ms (max {values['max_ms']:.3f})")
+        for name, values in stats['counters'].items():
+            print(f"  {name:<28} {values['mean']:8.1f} (max {values['max']:.1f})")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    simulation = Simulation(ant_count=args.ants, food_count=args.food, pheromone_mode=args.pheromones,
+                            engine=args.engine, seed=args.seed, workers=args.workers,
+                            merge_radius=args.merge_radius)
+    if args.profile or args.trace:
+        simulation.profiler.enabled = True
+        simulation.profiler.trace = bool(args.trace)
+    if args.record:
+        from telemetry import TelemetryWriter
+        simulation.recorder = TelemetryWriter(args.record, simulation, every=args.record_every,
+                                              block=args.record_block)
+
+    if args.headless:
+        run_headless(simulation, args.ticks, args.dt)
+    else:
+        from renderer import Renderer
+        Renderer(simulation, show_profiler=args.profile).run(args.fps, args.tick_rate, args.speed, args.fast_forward)
+    recorder = simulation.recorder
+    simulation.close()
+    if recorder is not None and recorder.dropped_frames:
+        print(f"Recorder fell behind and dropped {recorder.dropped_frames} frames")
+
+    if args.trace:
+        simulation.profiler.export_trace(args.trace)
+        print(f"Trace written to {args.trace}")
+
+
+if __name__ == '__main__':
+    main()
+    sys.exit()
@@ -0,0 +1,196 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from anthill import AntHill
+from pheromone import PheromoneManager
+from swarm import Swarm
+
+# Shared memory blocks attached by this (worker) process: block name -> SharedMemory
+_ATTACHED = {}
+
+def _attach(layout):
+    """Get the shared arrays described by layout, attaching the blocks once per process"""
+    names = {block_name for _, block_name, _, _ in layout}
+    if not names.issubset(_ATTACHED):
+        # Blocks were recreated (resized swarm or grown pheromone arrays), drop the old ones
+        for block in _ATTACHED.values():
+            block.close()
+        _ATTACHED.clear()
+        for block_name in names:
+            _ATTACHED[block_name] = SharedMemory(name=block_name)
+    return {name: np.ndarray(shape, dtype=dtype, buffer=_ATTACHED[block_name].buf)
+            for name, block_name, dtype, shape in layout}
+
+
+def _step_tile(task):
+    """
+    Run Swarm.update for the ants of one tile (in a worker process).
+    The tile's ants are read from and written back to shared memory and its
+    halo is selected from the shared pheromone arrays; the pheromones it
+    deposited are returned for the per-tick merge.
+    """
+    arrays = _attach(task['layout'])
+    ids = task['ids']
+    swarm = Swarm(len(ids), 0, 0, task['scale'], task['map_width'], task['map_height'],
+                  np.random.default_rng(task['seed']), task['species'])
+    swarm.set_state({name: arrays[name][ids] for name in Swarm.STATE})
+    swarm.set_ant_hills([AntHill(x, y, radius) for x, y, radius in task['hills']])
+
+    # Local pheromones: the tile plus its halo, deposits get appended after them
+    count = task['pheromone_count']
+    xs, ys = arrays['pheromone_x'][:count], arrays['pheromone_y'][:count]
+    min_x, min_y, max_x, max_y = task['halo']
+    halo = np.flatnonzero((xs >= min_x) & (xs <= max_x) & (ys >= min_y) & (ys <= max_y))
+    manager = PheromoneManager(evaporation_rate=0, influence_radius=task['influence_radius'],
+                               capacity=max(1024, len(halo) + len(ids)))
+    manager.add_pheromones(xs[halo], ys[halo], 'return', strength=arrays['pheromone_strength'][halo])
+    manager.index()
+    halo_count = manager.count
+    swarm.set_pheromone_manager(manager)
+
+    swarm.update(task['deltaTime'])
+
+    for name in Swarm.STATE:
+        arrays[name][ids] = getattr(swarm, name)
+    end = manager.count
+    return (manager.x[halo_count:end].copy(), manager.y[halo_count:end].copy(),
+            manager.get_strengths(slice(halo_count, end)))
+
+
+class TiledStepper:
+    """
+    Steps a Swarm across several worker processes.
+    The map is split into cols x rows tiles, each stepped by one task in a
+    process pool. The per-ant arrays of the swarm are moved into shared
+    memory on the first tick and stay there (the swarm's attributes become
+    views of the shared blocks until close()), so only the ant ids of a tile
+    travel to its worker. Ownership is recomputed from the ant positions
+    every tick, which hands ants that crossed a border over to the
+    neighbouring tile. Every tile sees the 'return' pheromones inside its
+    bounds plus a halo of one influence radius: the live pheromones are
+    copied to shared memory once per tick and each worker selects its own
+    halo from them. The pheromones dropped by all tiles are merged into the
+    shared pheromone manager after the tick.
+
+    Random numbers come from one generator per tile and tick, seeded from
+    the swarm's generator, so a run is reproducible for a fixed tiling, but
+    it does not follow the same random stream as a serial Swarm.update.
+    Swarms smaller than min_ants are not worth the round trip to the
+    workers and should be stepped serially (see Simulation._step_swarm).
+    """
+    def __init__(self, workers, tiles=None, min_ants=1000):
+        self.workers = workers
+        self.min_ants = min_ants
+        self.cols, self.rows = tiles if tiles is not None else (workers, 1)
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.blocks = {}  # array name -> SharedMemory
+        self.shared = {}  # array name -> array backed by the block
+        self.swarm = None  # Swarm whose state lives in the shared blocks
+
+    def _share(self, name, shape, dtype):
+        """Get the shared array `name`, (re)creating its block when the shape or dtype changed"""
+        array = self.shared.get(name)
+        if array is not None and array.shape == shape and array.dtype == dtype:
+            return array
+        self._free(name)
+        block = SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+        self.blocks[name] = block
+        self.shared[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        return self.shared[name]
+
+    def _free(self, name):
+        """Free the shared memory block of one array (nothing may reference the array anymore)"""
+        self.shared.pop(name, None)
+        block = self.blocks.pop(name, None)
+        if block is not None:
+            block.close()
+            block.unlink()
+
+    def _make_resident(self, swarm):
+        """Move every per-ant array of the swarm that is not in shared memory yet into it"""
+        if self.swarm is not None and self.swarm is not swarm:
+            self._detach()
+        self.swarm = swarm
+        for name in Swarm.STATE:
+            array = getattr(swarm, name)
+            if array is self.shared.get(name):
+                continue
+            # New swarm, resized or replaced by set_state: copy it in once
+            shared = self._share(name, array.shape, array.dtype)
+            np.copyto(shared, array)
+            setattr(swarm, name, shared)
+
+    def _detach(self):
+        """Give the swarm private copies of its shared arrays"""
+        swarm = self.swarm
+        for name in Swarm.STATE:
+            array = getattr(swarm, name)
+            if array is self.shared.get(name):
+                setattr(swarm, name, array.copy())
+        self.swarm = None
+
+    def _share_pheromones(self, manager, swarm, radius):
+        """Copy the live 'return' pheromones that any halo can reach to shared memory, returns their count"""
+        arrays = manager.get_region_arrays('return', -radius, -radius,
+                                           swarm.map_width + radius, swarm.map_height + radius)
+        count = len(arrays[0])
+        # Blocks grow in powers of two, so they are rarely recreated
+        capacity = 1 << max(10, (count - 1).bit_length())
+        for name, values in zip(('pheromone_x', 'pheromone_y', 'pheromone_strength'), arrays):
+            self._share(name, (capacity,), values.dtype)[:count] = values
+        return count
+
+    def tile_bounds(self, col, row, map_width, map_height):
+        """Get the (min_x, min_y, max_x, max_y) rectangle of a tile"""
+        width, height = map_width / self.cols, map_height / self.rows
+        return col * width, row * height, (col + 1) * width, (row + 1) * height
+
+    def tile_of(self, positions, map_width, map_height):
+        """Get the tile number (row * cols + col) owning each position"""
+        col = np.clip((positions[:, 0] * self.cols // map_width).astype(np.int64), 0, self.cols - 1)
+        row = np.clip((positions[:, 1] * self.rows // map_height).astype(np.int64), 0, self.rows - 1)
+        return row * self.cols + col
+
+    def update(self, swarm, deltaTime):
+        """Advance every ant by one tick, like swarm.update(deltaTime)"""
+        self._make_resident(swarm)
+        manager = swarm.pheromone_manager
+        radius = manager.influence_radius
+        pheromone_count = self._share_pheromones(manager, swarm, radius)
+        layout = [(name, self.blocks[name].name, array.dtype.str, array.shape) for name, array in self.shared.items()]
+
+        tile_count = self.cols * self.rows
+        owner = self.tile_of(swarm.position, swarm.map_width, swarm.map_height)
+        order = np.argsort(owner, kind='stable')
+        starts = np.searchsorted(owner[order], np.arange(tile_count + 1))
+        seeds = swarm.rng.integers(0, 2 ** 63, tile_count)
+        hills = [(hill.position.x, hill.position.y, hill.radius) for hill in swarm.hill_field.hills]
+
+        futures = []
+        for tile in range(tile_count):
+            ids = order[starts[tile]:starts[tile + 1]]
+            if not len(ids):
+                continue
+            min_x, min_y, max_x, max_y = self.tile_bounds(tile % self.cols, tile // self.cols,
+                                                          swarm.map_width, swarm.map_height)
+            futures.append(self.executor.submit(_step_tile, {
+                'layout': layout, 'ids': ids, 'seed': int(seeds[tile]), 'deltaTime': deltaTime,
+                'scale': swarm.scale, 'map_width': swarm.map_width, 'map_height': swarm.map_height,
+                'species': swarm.species, 'hills': hills, 'influence_radius': radius,
+                'pheromone_count': pheromone_count,
+                'halo': (min_x - radius, min_y - radius, max_x + radius, max_y + radius)
+            }))
+        deposits = [future.result() for future in futures]
+
+        # Merge the tick: the ant state is already in place, deposits go in in tile order
+        for xs, ys, strengths in deposits:
+            if len(xs):
+                manager.add_pheromones(xs, ys, 'return', strength=strengths)
+
+    def close(self):
+        """Stop the worker processes and free the shared memory (the swarm keeps private copies)"""
+        self.executor.shutdown()
+        if self.swarm is not None:
+            self._detach()
+        for name in list(self.blocks):
+            self._free(name)
@@ -0,0 +1,82 @@
+import numpy as np
+
+class PathMemory:
+    """
+    Fixed-capacity ring buffers of recent path points for a whole colony.
+    All points live in one preallocated (count, capacity, 2) float32 array
+    indexed by ant id, with a write head and a length per ant, so appending
+    and evicting the oldest point are O(1) and allocate nothing.
+    """
+    def __init__(self, count, capacity=200):
+        self.capacity = capacity
+        self.points = np.zeros((count, capacity, 2), dtype=np.float32)
+        self.head = np.zeros(count, dtype=np.int64)  # Slot the next point is written to
+        self.length = np.zeros(count, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.length)
+
+    def append(self, i, x, y):
+        """Add a point to the path of ant i, evicting its oldest point when full"""
+        head = self.head[i]
+        self.points[i, head] = (x, y)
+        self.head[i] = (head + 1) % self.capacity
+        if self.length[i] < self.capacity:
+            self.length[i] += 1
+
+    def append_many(self, indices, xs, ys):
+        """Add one point each to the paths of many (distinct) ants at once"""
+        heads = self.head[indices]
+        self.points[indices, heads, 0] = xs
+        self.points[indices, heads, 1] = ys
+        self.head[indices] = (heads + 1) % self.capacity
+        self.length[indices] = np.minimum(self.length[indices] + 1, self.capacity)
+
+    def clear(self, indices):
+        """Forget the paths of one or many ants"""
+        self.head[indices] = 0
+        self.length[indices] = 0
+
+    def last(self, i):
+        """Get the newest point of ant i as (x, y), or None for an empty path"""
+        if self.length[i] == 0:
+            return None
+        x, y = self.points[i, self.head[i] - 1].tolist()
+        return x, y
+
+    def last_points(self, indices):
+        """Get the newest point of many ants as an (n, 2) array (undefined for empty paths)"""
+        return self.points[indices, self.head[indices] - 1]
+
+    def get_path(self, i):
+        """Get the path of ant i as a (length, 2) array, oldest point first"""
+        length = int(self.length[i])
+        slots = (self.head[i] - length + np.arange(length)) % self.capacity
+        return self.points[i, slots]
+
+    def iter_path(self, i, reverse=False):
+        """Iterate over the (x, y) points of ant i's path, oldest first (newest first with reverse=True)"""
+        points = self.get_path(i).tolist()
+        return reversed(points) if reverse else iter(points)
+
+    def get_state(self):
+        """Get all paths, oldest point first, as CSR-style lengths + points (for snapshots)"""
+        paths = [self.get_path(i) for i in range(len(self))]
+        return {
+            'path_lengths': self.length.copy(),
+            'path_points': np.concatenate(paths) if paths else np.empty((0, 2), dtype=np.float32)
+        }
+
+    def set_state(self, state):
+        """Restore paths saved by get_state (dropping the oldest points beyond capacity)"""
+        lengths = state['path_lengths']
+        starts = np.concatenate(([0], np.cumsum(lengths)))
+        count = len(lengths)
+        self.points = np.zeros((count, self.capacity, 2), dtype=np.float32)
+        self.head = np.zeros(count, dtype=np.int64)
+        self.length = np.zeros(count, dtype=np.int64)
+        for i in range(count):
+            path = state['path_points'][starts[i]:starts[i + 1]][-self.capacity:]
+            self.points[i, :len(path)] = path
+            self.length[i] = len(path)
+            self.head[i] = len(path) % self.capacity
@@ -1,23 +1,48 @@
 import pygame
 import math
+import heapq
+import numpy as np
 from parameters import COLOR
 
+EVAPORATION_THRESHOLD = 0.05  # Pheromones at or below this strength are removed
+
 class Pheromone:
     """
     Represents a single pheromone marker dropped by an ant.
-    Pheromones evaporate over time and influence ant movement.
+    This is a thin view into the PheromoneManager arrays - it stays valid
+    only until the next PheromoneManager.update, which compacts the storage.
     """
-    def __init__(self, x, y, pheromone_type, initial_strength=1.0):
-        self.position = pygame.math.Vector2(x, y)
-        self.type = pheromone_type  # 'search' (blue) or 'return' (red)
-        self.strength = initial_strength
-        self.max_strength = initial_strength
-        
+    __slots__ = ('manager', 'index')
+
+    def __init__(self, manager, index):
+        self.manager = manager
+        self.index = index
+
+    @property
+    def position(self):
+        return pygame.math.Vector2(float(self.manager.x[self.index]), float(self.manager.y[self.index]))
+
+    @property
+    def type(self):
+        return self.manager.type_names[self.manager.type_code[self.index]]  # 'search' (blue) or 'return' (red)
+
+    @property
+    def strength(self):
+        return float(self.manager.get_strengths(self.index))
+
+    @strength.setter
+    def strength(self, value):
+        self.manager._set_strength(self.index, value)
+
+    @property
+    def max_strength(self):
+        return float(self.manager.max_strength[self.index])
+
     def evaporate(self, evaporation_rate, deltaTime):
         """Reduce pheromone strength over time"""
         self.strength -= evaporation_rate * deltaTime
-        return self.strength > 0.05  # Return True if still viable (increased threshold)
-    
+        return self.strength > EVAPORATION_THRESHOLD  # Return True if still viable (increased threshold)
+
     def get_influence(self, position, max_distance):
         """Calculate influence of this pheromone on a position"""
         distance = (self.position - position).length()
@@ -26,88 +51,878 @@ class Pheromone:
         # Influence decreases with distance
         influence = self.strength * (1.0 - distance / max_distance)
         return max(0.0, influence)
-    
+
     def draw(self, screen, scale=1.0):
         """Draw the pheromone as a colored dot"""
         color = COLOR.PHEROMONE_SEARCH if self.type == 'search' else COLOR.PHEROMONE_RETURN
         # Alpha based on strength
         alpha = int(min(255, self.strength * 255))
         radius = int(3 * scale)
-        
+        position = self.position
+
         # Create surface with alpha
         surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
         color_with_alpha = (*color, alpha)
         pygame.draw.circle(surf, color_with_alpha, (radius, radius), radius)
-        screen.blit(surf, (int(self.position.x - radius), int(self.position.y - radius)))
+        screen.blit(surf, (int(position.x - radius), int(position.y - radius)))
 
 
 class PheromoneManager:
     """
     Manages all pheromones in the simulation.
     Handles evaporation, influence calculations, and rendering.
+    Pheromones are stored as parallel NumPy arrays (structure of arrays);
+    only the first `count` entries of each array are in use.
+    Evaporation is lazy: a pheromone keeps the strength it had at its
+    deposit time and its current strength is computed when read. Every
+    pheromone is listed in a time bucket of its expiry time, and update()
+    only touches the pheromones of buckets that have expired: they are
+    flagged and taken out of their hash cells, so a tick costs as much as
+    the pheromones it adds and removes. The storage is compacted once the
+    expired pheromones outnumber the live ones. Pheromones that have
+    evaporated but wait for their bucket are skipped by all queries and
+    not counted.
+    With a merge_radius, a deposit closer than merge_radius to a marker of
+    the same type reinforces the nearest such marker (up to
+    max_merged_strength) instead of adding a new one, so busy trails keep a
+    number of markers bounded by their length rather than their traffic.
     """
-    def __init__(self, evaporation_rate=0.3, influence_radius=50):
-        self.pheromones = []
+    ARRAYS = ('x', 'y', 'strength', 'max_strength', 'type_code')
+    # Arrays saved by get_state: ARRAYS plus the time each strength was set at
+    SAVED = ARRAYS + ('deposit_time',)
+    # Storage arrays: SAVED plus the flag of expired pheromones waiting for the next compaction
+    STORAGE = SAVED + ('expired',)
+
+    def __init__(self, evaporation_rate=0.3, influence_radius=50, capacity=1024,
+                 merge_radius=0, max_merged_strength=10.0, expiry_bucket=0.25):
         self.evaporation_rate = evaporation_rate
         self.influence_radius = influence_radius
-        
+        self.merge_radius = merge_radius  # 0 disables coalescing
+        self.max_merged_strength = max_merged_strength
+        self.type_codes = {'search': 0, 'return': 1}
+        self.type_names = ['search', 'return']
+        self.type_counts = np.zeros(len(self.type_names), dtype=np.int64)  # Unexpired pheromones per type code
+
+        # Structure-of-arrays storage
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.strength = np.zeros(capacity)  # Strength at deposit_time
+        self.max_strength = np.zeros(capacity)
+        self.type_code = np.zeros(capacity, dtype=np.int8)
+        self.deposit_time = np.zeros(capacity)
+        self.expired = np.zeros(capacity, dtype=bool)
+        self.expired_count = 0
+
+        # Evaporation clock and expiry buckets: bucket -> list of index arrays of its pheromones, plus
+        # a heap of bucket numbers. A pheromone whose strength was set again is listed in its new
+        # bucket too, its old entry is skipped as stale.
+        self.time = 0.0
+        self.expiry_bucket = expiry_bucket  # Bucket width in seconds
+        self.bucket_members = {}
+        self.bucket_heap = []
+
+        # Spatial hash over the first `indexed_count` pheromones:
+        # type code -> {(cell_x, cell_y): array of indices}
+        # Cells are influence_radius wide, so a radius query touches at most 3x3 cells.
+        # Pheromones added since the last update are scanned as an unindexed tail.
+        self.cell_size = max(1.0, float(influence_radius))
+        self.cells = {}
+        self.layouts = {}  # type code -> CSR copy of its cells, see _cell_layout
+        self.indexed_count = 0
+
+        # draw() state kept between frames: per type code a layer of dot strengths
+        # (x 255, as of layer_time) and an overlay in the type's color
+        self._reset_layers(None, None)
+
+        # Query counters for profiling: radius queries run and candidates scanned by them
+        self.queries = 0
+        self.scanned = 0
+
+    @property
+    def pheromones(self):
+        """Views of all unexpired pheromones (valid until the next update)"""
+        return [Pheromone(self, i) for i in np.flatnonzero(~self.expired[:self.count]).tolist()]
+
+    def _get_type_code(self, pheromone_type):
+        """Get the integer code of a pheromone type, registering new types"""
+        code = self.type_codes.get(pheromone_type)
+        if code is None:
+            code = len(self.type_names)
+            self.type_codes[pheromone_type] = code
+            self.type_names.append(pheromone_type)
+            self.type_counts = np.append(self.type_counts, 0)
+        return code
+
+    def get_strengths(self, indices=slice(None)):
+        """Get the current (evaporated) strength of pheromones by index (default: all, including dead ones)"""
+        if isinstance(indices, slice):
+            indices = slice(*indices.indices(self.count))
+        return self.strength[indices] - self.evaporation_rate * (self.time - self.deposit_time[indices])
+
+    def _expiry_buckets(self, indices):
+        """Get the expiry bucket of pheromones by index (+inf without evaporation)"""
+        if self.evaporation_rate <= 0:
+            return np.full(np.shape(self.strength[indices]), np.inf)
+        expiry = self.deposit_time[indices] + (self.strength[indices] - EVAPORATION_THRESHOLD) / self.evaporation_rate
+        return np.floor(expiry / self.expiry_bucket)
+
+    def _add_to_buckets(self, indices):
+        """List pheromones (an index array) in their expiry buckets"""
+        buckets = self._expiry_buckets(indices)
+        order = np.argsort(buckets, kind='stable')
+        keys, starts = np.unique(buckets[order], return_index=True)
+        ends = starts[1:].tolist() + [len(order)]
+        for key, start, end in zip(keys.tolist(), starts.tolist(), ends):
+            if key == math.inf:
+                continue
+            members = self.bucket_members.get(key)
+            if members is None:
+                members = self.bucket_members[key] = []
+                heapq.heappush(self.bucket_heap, key)
+            members.append(indices[order[start:end]])
+
+    def _bucket_pheromones(self, bucket):
+        """Get the unexpired pheromones of an expiry bucket, skipping stale entries"""
+        members = np.unique(np.concatenate(self.bucket_members[bucket]))
+        members = members[~self.expired[members]]
+        return members[self._expiry_buckets(members) == bucket]
+
+    def _set_strength(self, i, value):
+        """Set the current strength of pheromone i, moving it to its new expiry bucket"""
+        self.strength[i] = value
+        self.deposit_time[i] = self.time
+        self.max_strength[i] = max(self.max_strength[i], value)
+        self._add_to_buckets(np.array([i]))
+
+    def _grow(self):
+        """Double the capacity of the storage arrays"""
+        capacity = max(1, len(self.x) * 2)
+        for name in self.STORAGE:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def _cell_of(self, x, y):
+        """Get the spatial hash cell containing a point"""
+        return (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+
+    def _rebuild_index(self, n=None):
+        """Rebuild the spatial hash from the first n (default: all) live pheromones in one sort"""
+        self.cells = {}
+        self.layouts = {}
+        self.indexed_count = 0
+        self._index_tail(self.count if n is None else n)
+
+    def _index_tail(self, n=None):
+        """Add pheromones indexed_count..n (default: all) to their spatial hash cells in one sort"""
+        n = self.count if n is None else n
+        start = self.indexed_count
+        self.indexed_count = n
+        if start >= n:
+            return
+        self.layouts = {}
+
+        codes = self.type_code[start:n]
+        cell_x = np.floor(self.x[start:n] / self.cell_size).astype(np.int64)
+        cell_y = np.floor(self.y[start:n] / self.cell_size).astype(np.int64)
+        order = np.lexsort((cell_y, cell_x, codes))
+        keys = np.stack((codes[order], cell_x[order], cell_y[order]), axis=1)
+        order += start
+
+        # Each run of equal (type, cell_x, cell_y) keys is one cell; new indices are larger,
+        # so appending them keeps every cell sorted like a full rebuild would
+        starts = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+        starts = [0] + starts.tolist()
+        ends = starts[1:] + [n - start]
+        for run_start, run_end in zip(starts, ends):
+            code, cx, cy = keys[run_start].tolist()
+            type_cells = self.cells.setdefault(code, {})
+            cell = type_cells.get((cx, cy))
+            added = order[run_start:run_end]
+            type_cells[(cx, cy)] = added if cell is None else np.concatenate((cell, added))
+
+    def index(self):
+        """Index the pheromones added since the last update now, e.g. after a bulk load, so queries do not scan them"""
+        self._index_tail()
+
+    def _candidate_indices(self, code, px, py, radius):
+        """Get indices of the pheromones of a type code in the cells (and unindexed tail) around a point, or None"""
+        parts = []
+        type_cells = self.cells.get(code)
+        if type_cells:
+            min_x, min_y = self._cell_of(px - radius, py - radius)
+            max_x, max_y = self._cell_of(px + radius, py + radius)
+            for cell_x in range(min_x, max_x + 1):
+                for cell_y in range(min_y, max_y + 1):
+                    cell = type_cells.get((cell_x, cell_y))
+                    if cell is not None:
+                        parts.append(cell)
+        if self.indexed_count < self.count:
+            tail = np.arange(self.indexed_count, self.count)
+            parts.append(tail[self.type_code[tail] == code])
+        return np.concatenate(parts) if parts else None
+
+    def _cell_layout(self, code):
+        """
+        Get the hash cells of a type code CSR-style, or None when it has none:
+        (origin_x, origin_y, cols, rows, cell_starts, cell_indices) over the
+        bounding box of its cells, with cells in row-major order. Cached until
+        the index changes.
+        """
+        if code in self.layouts:
+            return self.layouts[code]
+        type_cells = self.cells.get(code)
+        layout = None
+        if type_cells:
+            keys = np.array(list(type_cells.keys()), dtype=np.int64)
+            parts = list(type_cells.values())
+            origin_x, origin_y = keys.min(axis=0).tolist()
+            cols, rows = (keys.max(axis=0) - (origin_x, origin_y) + 1).tolist()
+            dense = (keys[:, 1] - origin_y) * cols + (keys[:, 0] - origin_x)
+            counts = np.zeros(rows * cols, dtype=np.int64)
+            counts[dense] = [len(part) for part in parts]
+            cell_indices = np.concatenate([parts[i] for i in np.argsort(dense).tolist()])
+            layout = (origin_x, origin_y, cols, rows, np.concatenate(([0], np.cumsum(counts))), cell_indices)
+        self.layouts[code] = layout
+        return layout
+
+    def _query_indices(self, position, pheromone_type, radius):
+        """Get indices of all pheromones of a type within a radius"""
+        code = self.type_codes.get(pheromone_type)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        px, py = position[0], position[1]
+
+        indices = self._candidate_indices(code, px, py, radius)
+        if indices is None:
+            return np.empty(0, dtype=np.int64)
+        self.queries += 1
+        self.scanned += len(indices)
+        dx = self.x[indices] - px
+        dy = self.y[indices] - py
+        alive = self.get_strengths(indices) > EVAPORATION_THRESHOLD
+        return indices[(dx * dx + dy * dy <= radius * radius) & alive]
+
+    def _merge(self, x, y, code, strength):
+        """Reinforce the nearest same-type marker within merge_radius, returns False when there is none"""
+        indices = self._candidate_indices(code, x, y, self.merge_radius)
+        if indices is None:
+            return False
+        current = self.get_strengths(indices)
+        alive = current > EVAPORATION_THRESHOLD
+        indices, current = indices[alive], current[alive]
+        if not len(indices):
+            return False
+        dx = self.x[indices] - x
+        dy = self.y[indices] - y
+        distance = dx * dx + dy * dy
+        nearest = int(distance.argmin())
+        if distance[nearest] > self.merge_radius * self.merge_radius:
+            return False
+        # Capped, but never weaker than before
+        value = float(current[nearest])
+        self._set_strength(int(indices[nearest]), max(value, min(self.max_merged_strength, value + strength)))
+        return True
+
     def add_pheromone(self, x, y, pheromone_type, strength=1.0):
-        """Add a new pheromone to the system"""
-        pheromone = Pheromone(x, y, pheromone_type, strength)
-        self.pheromones.append(pheromone)
-    
+        """Add a new pheromone to the system (or reinforce a close one when merging)"""
+        if self.merge_radius > 0 and self._merge(x, y, self._get_type_code(pheromone_type), strength):
+            return
+        if self.count == len(self.x):
+            self._grow()
+        i = self.count
+        code = self._get_type_code(pheromone_type)
+        self.x[i] = x
+        self.y[i] = y
+        self.strength[i] = strength
+        self.max_strength[i] = strength
+        self.type_code[i] = code
+        self.deposit_time[i] = self.time
+        self.count += 1
+        self.type_counts[code] += 1
+        self._add_to_buckets(np.array([i]))
+
+    def add_pheromones(self, xs, ys, pheromone_type, strength=1.0):
+        """Add many pheromones of one type at once"""
+        if self.merge_radius > 0:
+            # In order, so deposits of one batch can also merge into each other
+            strengths = np.broadcast_to(strength, np.shape(xs))
+            for x, y, deposit in zip(np.asarray(xs).tolist(), np.asarray(ys).tolist(), strengths.tolist()):
+                self.add_pheromone(x, y, pheromone_type, deposit)
+            return
+        added = len(xs)
+        while self.count + added > len(self.x):
+            self._grow()
+        start, end = self.count, self.count + added
+        code = self._get_type_code(pheromone_type)
+        self.x[start:end] = xs
+        self.y[start:end] = ys
+        self.strength[start:end] = strength
+        self.max_strength[start:end] = strength
+        self.type_code[start:end] = code
+        self.deposit_time[start:end] = self.time
+        self.count = end
+        self.type_counts[code] += added
+        self._add_to_buckets(np.arange(start, end))
+
+    def _expire(self):
+        """Flag the pheromones of every expiry bucket that has fully evaporated and take them out of the hash"""
+        heap = self.bucket_heap
+        expired = []
+        while heap and (heap[0] + 1) * self.expiry_bucket <= self.time:
+            bucket = heapq.heappop(heap)
+            expired.append(self._bucket_pheromones(bucket))
+            del self.bucket_members[bucket]
+        if not expired:
+            return
+        expired = np.concatenate(expired)
+        if not len(expired):
+            return
+        self.expired[expired] = True
+        self.expired_count += len(expired)
+        self.type_counts -= np.bincount(self.type_code[expired], minlength=len(self.type_counts))
+        if self.expired_count > self.count - self.expired_count:
+            self._compact()
+            return
+
+        # Every expired pheromone is indexed (update indexes the tail first); filter the cells it is in
+        codes = self.type_code[expired]
+        cell_x = np.floor(self.x[expired] / self.cell_size).astype(np.int64)
+        cell_y = np.floor(self.y[expired] / self.cell_size).astype(np.int64)
+        order = np.lexsort((cell_y, cell_x, codes))
+        keys = np.stack((codes[order], cell_x[order], cell_y[order]), axis=1)
+        starts = np.flatnonzero(np.r_[True, np.any(keys[1:] != keys[:-1], axis=1)])
+        for code, cx, cy in keys[starts].tolist():
+            type_cells = self.cells[code]
+            cell = type_cells[(cx, cy)]
+            cell = cell[~self.expired[cell]]
+            if len(cell):
+                type_cells[(cx, cy)] = cell
+            else:
+                del type_cells[(cx, cy)]
+        self.layouts = {}
+
+    def _compact(self):
+        """Drop the expired pheromones from the storage, then list and index the rest again"""
+        n = self.count
+        keep = np.flatnonzero(~self.expired[:n])
+        indexed = int(np.count_nonzero(keep < self.indexed_count))
+        for name in self.STORAGE:
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.expired[len(keep):n] = False
+        self.count = len(keep)
+        self.expired_count = 0
+        self.bucket_members = {}
+        self.bucket_heap = []
+        self._add_to_buckets(np.arange(self.count))
+        self._rebuild_index(indexed)
+
     def update(self, deltaTime):
-        """Update all pheromones (evaporation)"""
-        self.pheromones = [p for p in self.pheromones 
-                          if p.evaporate(self.evaporation_rate, deltaTime)]
-    
+        """
+        Advance the evaporation clock, index new pheromones and drop expired buckets.
+        The pheromones added since the last update are appended to their cells and
+        the expired ones are filtered out of theirs, so only a compaction (which
+        moves pheromones) rebuilds the whole spatial hash.
+        """
+        self.time += deltaTime
+        self._index_tail()
+        self._expire()
+
     def get_pheromone_influence(self, position, pheromone_type):
         """
         Calculate the direction and strength of pheromone influence at a position.
         Returns a direction vector weighted by pheromone strength.
         """
-        influence_vector = pygame.math.Vector2(0, 0)
-        total_weight = 0.0
-        
-        for pheromone in self.pheromones:
-            if pheromone.type != pheromone_type:
-                continue
-                
-            influence = pheromone.get_influence(position, self.influence_radius)
-            if influence > 0:
-                direction = (pheromone.position - position)
-                if direction.length() > 0:
-                    direction = direction.normalize()
-                    influence_vector += direction * influence
-                    total_weight += influence
-        
-        if total_weight > 0:
+        indices = self._query_indices(position, pheromone_type, self.influence_radius)
+        dx = self.x[indices] - position[0]
+        dy = self.y[indices] - position[1]
+        distance = np.hypot(dx, dy)
+        # Influence decreases with distance
+        influence = self.get_strengths(indices) * (1.0 - distance / self.influence_radius)
+        mask = (influence > 0) & (distance > 0)
+
+        if mask.any():
+            weights = influence[mask]
+            total_weight = float(weights.sum())
             # Normalize by total weight to get average direction
-            influence_vector = influence_vector / total_weight
+            influence_vector = pygame.math.Vector2(
+                float((dx[mask] / distance[mask] * weights).sum()) / total_weight,
+                float((dy[mask] / distance[mask] * weights).sum()) / total_weight
+            )
             # Return direction and strength (0 to 1)
             strength = min(1.0, total_weight)
             return influence_vector, strength
-        
+
         return pygame.math.Vector2(0, 0), 0.0
-    
+
+    def get_region_arrays(self, pheromone_type, min_x, min_y, max_x, max_y):
+        """Get x, y and strength arrays of all pheromones of a type inside a rectangle"""
+        code = self.type_codes.get(pheromone_type)
+        if code is None:
+            return np.empty(0), np.empty(0), np.empty(0)
+        n = self.count
+        xs, ys, strengths = self.x[:n], self.y[:n], self.get_strengths()
+        mask = (self.type_code[:n] == code) & (xs >= min_x) & (xs <= max_x) & (ys >= min_y) & (ys <= max_y)
+        mask &= strengths > EVAPORATION_THRESHOLD
+        return xs[mask], ys[mask], strengths[mask]
+
     def get_nearby_pheromones(self, position, pheromone_type, radius):
         """Get all pheromones of a type within a radius"""
-        nearby = []
-        for pheromone in self.pheromones:
-            if pheromone.type == pheromone_type:
-                if (pheromone.position - position).length() <= radius:
-                    nearby.append(pheromone)
-        return nearby
-    
+        return [Pheromone(self, i) for i in self._query_indices(position, pheromone_type, radius).tolist()]
+
+    def get_nearby_arrays(self, position, pheromone_type, radius):
+        """Get x, y and strength arrays of all pheromones of a type within a radius"""
+        indices = self._query_indices(position, pheromone_type, radius)
+        return self.x[indices], self.y[indices], self.get_strengths(indices)
+
+    def get_nearby_batch(self, positions, pheromone_type, radius, chunk_size=256):
+        """
+        Get the pheromones of a type within a radius of many (n, 2) positions as a
+        CSR-style neighbour list: (offsets, xs, ys, strengths), where the
+        pheromones of position i are entries offsets[i]:offsets[i + 1], in the
+        same order get_nearby_arrays returns them.
+        Like FoodIndex.find_visible_batch, every (position, cell) pair of the
+        hash (see _cell_layout) is expanded into candidates with array
+        operations, chunk_size positions at a time.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        n = len(positions)
+        code = self.type_codes.get(pheromone_type)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        if code is None or n == 0:
+            return offsets, np.empty(0), np.empty(0), np.empty(0)
+
+        layout = self._cell_layout(code)
+        if layout is None:
+            origin_x = origin_y = cols = rows = 0
+            cell_starts, cell_indices = np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64)
+        else:
+            origin_x, origin_y, cols, rows, cell_starts, cell_indices = layout
+        # Pheromones added since the last update form one extra cell that every position checks last,
+        # followed by an always empty cell for the cells of a position outside the grid
+        tail = np.arange(self.indexed_count, self.count)
+        tail = tail[self.type_code[tail] == code]
+        indices = np.concatenate((cell_indices, tail))
+        counts = np.concatenate((np.diff(cell_starts), [len(tail), 0]))
+        tail_cell, empty_cell = rows * cols, rows * cols + 1
+
+        # Candidates are the live pheromones only, gathered once in cell order
+        strengths = self.get_strengths(indices)
+        alive = strengths > EVAPORATION_THRESHOLD
+        counts = np.bincount(np.repeat(np.arange(len(counts)), counts)[alive], minlength=len(counts))
+        starts = np.concatenate(([0], np.cumsum(counts)))
+        indices, strengths = indices[alive], strengths[alive]
+        xs, ys = self.x[indices], self.y[indices]
+
+        px, py = positions[:, 0], positions[:, 1]
+        min_x = np.floor((px - radius) / self.cell_size).astype(np.int64)
+        min_y = np.floor((py - radius) / self.cell_size).astype(np.int64)
+        max_x = np.floor((px + radius) / self.cell_size).astype(np.int64)
+        max_y = np.floor((py + radius) / self.cell_size).astype(np.int64)
+        # Cells of every position in the order of _candidate_indices: by x, then by y, then the tail
+        span_x, span_y = int((max_x - min_x).max()) + 1, int((max_y - min_y).max()) + 1
+        offset_x = np.repeat(np.arange(span_x), span_y)
+        offset_y = np.tile(np.arange(span_y), span_x)
+
+        found = []
+        for start in range(0, n, chunk_size):
+            ants = np.arange(start, min(n, start + chunk_size))
+            cell_x = min_x[ants, None] + offset_x
+            cell_y = min_y[ants, None] + offset_y
+            # Skip cells past the position's range and cells whose nearest point is out of reach
+            gap_x = np.maximum(cell_x * self.cell_size - px[ants, None], px[ants, None] - (cell_x + 1) * self.cell_size)
+            gap_y = np.maximum(cell_y * self.cell_size - py[ants, None], py[ants, None] - (cell_y + 1) * self.cell_size)
+            gap_x, gap_y = np.maximum(gap_x, 0), np.maximum(gap_y, 0)
+            inside = (cell_x <= max_x[ants, None]) & (cell_y <= max_y[ants, None]) & \
+                (gap_x * gap_x + gap_y * gap_y <= radius * radius)
+            cell_x -= origin_x
+            cell_y -= origin_y
+            inside &= (cell_x >= 0) & (cell_x < cols) & (cell_y >= 0) & (cell_y < rows)
+            cells = np.where(inside, cell_y * cols + cell_x, empty_cell)
+            cells = np.hstack((cells, np.full((len(ants), 1), tail_cell))).ravel()
+            pair_counts = counts[cells]
+            total = int(pair_counts.sum())
+            if total == 0:
+                continue
+            self.queries += int(np.count_nonzero(pair_counts.reshape(len(ants), -1).any(axis=1)))
+            self.scanned += total
+
+            # Expand every (position, cell) pair into one (position, pheromone) candidate pair
+            pair_first = np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+            slots = np.repeat(starts[cells], pair_counts) + np.arange(total) - pair_first
+            owner = np.repeat(np.repeat(ants, len(offset_x) + 1), pair_counts)
+            dx = xs[slots] - px[owner]
+            dy = ys[slots] - py[owner]
+            near = np.flatnonzero(dx * dx + dy * dy <= radius * radius)
+            found.append((owner[near], slots[near]))
+
+        if not found:
+            return offsets, np.empty(0), np.empty(0), np.empty(0)
+        owner, slots = (np.concatenate(arrays) for arrays in zip(*found))
+        np.cumsum(np.bincount(owner, minlength=n), out=offsets[1:])
+        return offsets, xs[slots], ys[slots], strengths[slots]
+
+    def _reset_layers(self, size, radius):
+        """Start empty strength layers of a screen size and dot radius"""
+        self.layer_size = size
+        self.layer_radius = radius
+        self.layer_time = None
+        self.layers = {}
+        self.layer_peaks = {}
+        self.overlays = {}
+
+    def _stamp(self, indices, radius):
+        """Rasterize pheromones into the strength layers (strongest dot wins per pixel)"""
+        strengths = self.get_strengths(indices) * 255
+        alive = strengths > EVAPORATION_THRESHOLD * 255
+        indices, strengths = indices[alive], strengths[alive]
+        if not len(indices):
+            return
+
+        # Pixels of a dot, relative to the top-left corner of its 2r x 2r square
+        offset_x, offset_y = np.meshgrid(np.arange(2 * radius), np.arange(2 * radius))
+        inside = (offset_x + 0.5 - radius) ** 2 + (offset_y + 0.5 - radius) ** 2 <= radius * radius
+        offset_x, offset_y = offset_x[inside], offset_y[inside]
+
+        width, height = self.layer_size
+        codes = self.type_code[indices]
+        for code in np.unique(codes).tolist():
+            of_type = codes == code
+            pixel_x = (self.x[indices[of_type]] - radius).astype(np.int64)[:, None] + offset_x
+            pixel_y = (self.y[indices[of_type]] - radius).astype(np.int64)[:, None] + offset_y
+            value = np.broadcast_to(strengths[of_type, None], pixel_x.shape)
+            on_screen = (pixel_x >= 0) & (pixel_x < width) & (pixel_y >= 0) & (pixel_y < height)
+            if code not in self.layers:
+                self.layers[code] = np.zeros(self.layer_size, dtype=np.float32)
+                self.layer_peaks[code] = 0.0
+            np.maximum.at(self.layers[code], (pixel_x[on_screen], pixel_y[on_screen]), value[on_screen])
+            self.layer_peaks[code] = max(self.layer_peaks[code], float(strengths[of_type].max()))
+
     def draw(self, screen, scale=1.0):
-        """Draw all pheromones"""
-        for pheromone in self.pheromones:
-            pheromone.draw(screen, scale)
-    
+        """
+        Draw all pheromones as colored dots through persistent overlays.
+        Every type keeps a screen-sized layer of dot strengths between frames.
+        Evaporation is linear, so it fades the whole layer by the same amount
+        (and keeps the strongest dot of every pixel the strongest), and only
+        pheromones deposited or reinforced since the last frame are stamped.
+        The cost is a few array passes over the screen plus the new dots.
+        """
+        radius = int(3 * scale)
+        size = screen.get_size()
+        if self.layer_time is None or size != self.layer_size or radius != self.layer_radius \
+                or self.time < self.layer_time:
+            self._reset_layers(size, radius)
+        if radius == 0:
+            return
+
+        # Fade every layer by the evaporation since the last frame, then stamp new deposits
+        n = self.count
+        if self.layer_time is None:
+            fresh = np.arange(n)
+        else:
+            fade = self.evaporation_rate * (self.time - self.layer_time) * 255
+            if fade > 0:
+                for code, layer in self.layers.items():
+                    if self.layer_peaks[code] > 0:
+                        np.subtract(layer, fade, out=layer)
+                        np.multiply(layer, layer > EVAPORATION_THRESHOLD * 255, out=layer)  # Drop evaporated dots
+                        self.layer_peaks[code] = max(0.0, self.layer_peaks[code] - fade)
+            fresh = np.flatnonzero(self.deposit_time[:n] > self.layer_time)
+        self._stamp(fresh, radius)
+        self.layer_time = self.time
+
+        # Alpha from strength; where types overlap the strongest one shows (the first on ties)
+        active = [code for code in sorted(self.layers) if self.layer_peaks[code] > 0]
+        alphas = []
+        top = None
+        for code in active:
+            alpha = np.minimum(self.layers[code], 255).astype(np.uint8)
+            if top is not None:
+                stronger = alpha > top
+                for other in alphas:
+                    other[stronger] = 0
+                alpha[~stronger] = 0
+                np.maximum(top, alpha, out=top)
+            elif len(active) > 1:
+                top = alpha.copy()
+            alphas.append(alpha)
+
+        for code, alpha in zip(active, alphas):
+            overlay = self.overlays.get(code)
+            if overlay is None:
+                color = COLOR.PHEROMONE_SEARCH if self.type_names[code] == 'search' else COLOR.PHEROMONE_RETURN
+                overlay = pygame.Surface(size, pygame.SRCALPHA)
+                overlay.fill((*color, 0))
+                self.overlays[code] = overlay
+            overlay_alpha = pygame.surfarray.pixels_alpha(overlay)
+            overlay_alpha[...] = alpha
+            del overlay_alpha  # Unlock the overlay before blitting
+            screen.blit(overlay, (0, 0))
+
+    def get_state(self):
+        """Get all unexpired pheromones and the evaporation clock as arrays (for snapshots)"""
+        keep = np.flatnonzero(~self.expired[:self.count])
+        state = {name: getattr(self, name)[keep] for name in self.SAVED}
+        state['time'] = np.array(self.time)
+        state['type_names'] = np.array(self.type_names)
+        state['indexed_count'] = np.array(np.count_nonzero(keep < self.indexed_count))
+        return state
+
+    def set_state(self, state):
+        """Restore pheromones saved by get_state (strengths count as current when no deposit times are saved)"""
+        self.type_names = state['type_names'].tolist()
+        self.type_codes = {name: code for code, name in enumerate(self.type_names)}
+        self.count = len(state['x'])
+        self.time = float(state['time']) if 'time' in state else 0.0
+        capacity = max(1024, self.count)
+        for name in self.STORAGE:
+            array = np.zeros(capacity, dtype=getattr(self, name).dtype)
+            if name in state:
+                array[:self.count] = state[name]
+            elif name == 'deposit_time':
+                array[:self.count] = self.time
+            setattr(self, name, array)
+        self.type_counts = np.bincount(self.type_code[:self.count], minlength=len(self.type_names)).astype(np.int64)
+        self.expired_count = 0
+        self.bucket_members = {}
+        self.bucket_heap = []
+        self._add_to_buckets(np.arange(self.count))
+        self._rebuild_index(int(state['indexed_count']))
+        self._reset_layers(None, None)  # Redraw every dot on the next frame
+
+    def _evaporated(self):
+        """Get the pheromones that have evaporated but still wait for their expiry bucket"""
+        started = [bucket for bucket in self.bucket_members if bucket * self.expiry_bucket <= self.time]
+        if not started:
+            return np.empty(0, dtype=np.int64)
+        indices = np.concatenate([self._bucket_pheromones(bucket) for bucket in started])
+        return indices[self.get_strengths(indices) <= EVAPORATION_THRESHOLD]
+
     def get_count(self):
-        """Get total pheromone count"""
-        return len(self.pheromones)
-    
+        """Get total pheromone count (a pheromone stops counting at its exact expiry time)"""
+        return self.count - self.expired_count - len(self._evaporated())
+
     def get_count_by_type(self, pheromone_type):
         """Get count of specific pheromone type"""
-        return sum(1 for p in self.pheromones if p.type == pheromone_type)
+        code = self.type_codes.get(pheromone_type)
+        if code is None:
+            return 0
+        return int(self.type_counts[code]) - int(np.count_nonzero(self.type_code[self._evaporated()] == code))
+
+
+class PheromoneCell:
+    """
+    A single non-empty cell of a PheromoneField, returned from neighbour queries
+    so ants can treat field cells like individual pheromone markers.
+    """
+    __slots__ = ('position', 'type', 'strength')
+
+    def __init__(self, x, y, pheromone_type, strength):
+        self.position = pygame.math.Vector2(x, y)
+        self.type = pheromone_type
+        self.strength = strength
+
+
+class PheromoneField:
+    """
+    Grid-based alternative to PheromoneManager.
+    Each pheromone type is a fixed-resolution 2D float grid covering the map, so
+    memory and per-tick cost are constant no matter how many ants deposit.
+    Deposits add to cells, evaporation is one subtraction over the grid and
+    diffusion (blurring into neighbouring cells) is optional.
+    """
+    def __init__(self, map_width, map_height, resolution=10, evaporation_rate=0.3,
+                 influence_radius=50, diffusion_rate=0.0):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.resolution = resolution  # Cell size in pixels
+        self.evaporation_rate = evaporation_rate
+        self.influence_radius = influence_radius
+        self.diffusion_rate = diffusion_rate  # Fraction of each cell blurred into its neighbours per second
+        self.cols = max(1, int(math.ceil(map_width / resolution)))
+        self.rows = max(1, int(math.ceil(map_height / resolution)))
+        self.type_codes = {'search': 0, 'return': 1}
+        self.type_names = ['search', 'return']
+        self.grids = [np.zeros((self.rows, self.cols)) for _ in self.type_names]
+
+        # Query counters for profiling: radius queries run and cells scanned by them
+        self.queries = 0
+        self.scanned = 0
+
+    def _get_grid(self, pheromone_type, create=False):
+        """Get the grid of a pheromone type, optionally registering new types"""
+        code = self.type_codes.get(pheromone_type)
+        if code is None:
+            if not create:
+                return None
+            code = len(self.type_names)
+            self.type_codes[pheromone_type] = code
+            self.type_names.append(pheromone_type)
+            self.grids.append(np.zeros((self.rows, self.cols)))
+        return self.grids[code]
+
+    def _cell_of(self, x, y):
+        """Get the (column, row) of the cell containing a point, clamped to the map"""
+        col = min(self.cols - 1, max(0, int(x // self.resolution)))
+        row = min(self.rows - 1, max(0, int(y // self.resolution)))
+        return col, row
+
+    def add_pheromone(self, x, y, pheromone_type, strength=1.0):
+        """Add pheromone to the cell containing a point"""
+        col, row = self._cell_of(x, y)
+        self._get_grid(pheromone_type, create=True)[row, col] += strength
+
+    def add_pheromones(self, xs, ys, pheromone_type, strength=1.0):
+        """Add pheromone to the cells containing many points at once"""
+        cols = np.clip((np.asarray(xs) // self.resolution).astype(np.int64), 0, self.cols - 1)
+        rows = np.clip((np.asarray(ys) // self.resolution).astype(np.int64), 0, self.rows - 1)
+        np.add.at(self._get_grid(pheromone_type, create=True), (rows, cols), strength)
+
+    def update(self, deltaTime):
+        """Update all grids (diffusion and evaporation)"""
+        blur = min(1.0, self.diffusion_rate * deltaTime)
+        for grid in self.grids:
+            if blur > 0:
+                # Box blur: each cell keeps (1 - blur) and takes blur of its 3x3 neighbourhood mean
+                padded = np.pad(grid, 1, mode='edge')
+                neighbourhood = sum(padded[dy:dy + self.rows, dx:dx + self.cols]
+                                    for dy in range(3) for dx in range(3)) / 9.0
+                grid *= 1.0 - blur
+                grid += neighbourhood * blur
+            grid -= self.evaporation_rate * deltaTime
+            grid[grid <= EVAPORATION_THRESHOLD] = 0.0
+
+    def get_pheromone_influence(self, position, pheromone_type):
+        """
+        Calculate the direction and strength of pheromone influence at a position.
+        Uses the concentration gradient sampled influence_radius away on each axis.
+        """
+        grid = self._get_grid(pheromone_type)
+        if grid is None:
+            return pygame.math.Vector2(0, 0), 0.0
+
+        col, row = self._cell_of(position[0], position[1])
+        reach = max(1, int(self.influence_radius // self.resolution))
+        left, right = max(0, col - reach), min(self.cols - 1, col + reach)
+        top, bottom = max(0, row - reach), min(self.rows - 1, row + reach)
+        samples = (grid[row, left], grid[row, right], grid[top, col], grid[bottom, col], grid[row, col])
+
+        gradient = pygame.math.Vector2(float(grid[row, right] - grid[row, left]),
+                                       float(grid[bottom, col] - grid[top, col]))
+        if gradient.length() > 0:
+            return gradient.normalize(), min(1.0, float(max(samples)))
+
+        return pygame.math.Vector2(0, 0), 0.0
+
+    def get_nearby_arrays(self, position, pheromone_type, radius):
+        """Get centre x, centre y and strength arrays of all non-empty cells of a type within a radius"""
+        grid = self._get_grid(pheromone_type)
+        if grid is None:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        px, py = position[0], position[1]
+        min_col, min_row = self._cell_of(px - radius, py - radius)
+        max_col, max_row = self._cell_of(px + radius, py + radius)
+        window = grid[min_row:max_row + 1, min_col:max_col + 1]
+        self.queries += 1
+        self.scanned += window.size
+        rows, cols = np.nonzero(window)
+        centre_x = (cols + min_col + 0.5) * self.resolution
+        centre_y = (rows + min_row + 0.5) * self.resolution
+        mask = (centre_x - px) ** 2 + (centre_y - py) ** 2 <= radius * radius
+        return centre_x[mask], centre_y[mask], window[rows[mask], cols[mask]]
+
+    def get_region_arrays(self, pheromone_type, min_x, min_y, max_x, max_y):
+        """Get centre x, centre y and strength arrays of all non-empty cells of a type inside a rectangle"""
+        grid = self._get_grid(pheromone_type)
+        if grid is None:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        min_col, min_row = self._cell_of(min_x, min_y)
+        max_col, max_row = self._cell_of(max_x, max_y)
+        window = grid[min_row:max_row + 1, min_col:max_col + 1]
+        rows, cols = np.nonzero(window)
+        return (cols + min_col + 0.5) * self.resolution, (rows + min_row + 0.5) * self.resolution, window[rows, cols]
+
+    def get_nearby_batch(self, positions, pheromone_type, radius, chunk_size=1024):
+        """
+        Get the non-empty cells of a type near many (n, 2) positions as (offsets, xs, ys, strengths),
+        like PheromoneManager. The windows of chunk_size positions are read from the grid at once.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        n = len(positions)
+        grid = self._get_grid(pheromone_type)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        if grid is None or n == 0:
+            return offsets, np.empty(0), np.empty(0), np.empty(0)
+
+        # Windows clamped to the map like _cell_of, read row by row like get_nearby_arrays
+        px, py = positions[:, 0], positions[:, 1]
+        min_col = np.clip((px - radius) // self.resolution, 0, self.cols - 1).astype(np.int64)
+        max_col = np.clip((px + radius) // self.resolution, 0, self.cols - 1).astype(np.int64)
+        min_row = np.clip((py - radius) // self.resolution, 0, self.rows - 1).astype(np.int64)
+        max_row = np.clip((py + radius) // self.resolution, 0, self.rows - 1).astype(np.int64)
+        self.queries += n
+        self.scanned += int(((max_row - min_row + 1) * (max_col - min_col + 1)).sum())
+        span_rows, span_cols = int((max_row - min_row).max()) + 1, int((max_col - min_col).max()) + 1
+        offset_row = np.repeat(np.arange(span_rows), span_cols)
+        offset_col = np.tile(np.arange(span_cols), span_rows)
+
+        parts = []
+        for start in range(0, n, chunk_size):
+            ants = np.arange(start, min(n, start + chunk_size))
+            rows = min_row[ants, None] + offset_row
+            cols = min_col[ants, None] + offset_col
+            inside = (rows <= max_row[ants, None]) & (cols <= max_col[ants, None])
+            values = grid[np.where(inside, rows, 0), np.where(inside, cols, 0)]
+            centre_x = (cols + 0.5) * self.resolution
+            centre_y = (rows + 0.5) * self.resolution
+            inside &= (values != 0) & ((centre_x - px[ants, None]) ** 2 + (centre_y - py[ants, None]) ** 2 <= radius * radius)
+            owner, cell = np.nonzero(inside)
+            parts.append((owner + start, centre_x[owner, cell], centre_y[owner, cell], values[owner, cell]))
+
+        owner, xs, ys, strengths = (np.concatenate(arrays) for arrays in zip(*parts))
+        np.cumsum(np.bincount(owner, minlength=n), out=offsets[1:])
+        return offsets, xs, ys, strengths
+
+    def get_nearby_pheromones(self, position, pheromone_type, radius):
+        """Get all non-empty cells of a type whose centre is within a radius"""
+        xs, ys, strengths = self.get_nearby_arrays(position, pheromone_type, radius)
+        return [PheromoneCell(x, y, pheromone_type, s) for x, y, s in
+                zip(xs.tolist(), ys.tolist(), strengths.tolist())]
+
+    def draw(self, screen, scale=1.0):
+        """Draw the grids as one translucent overlay scaled to the map"""
+        rgba = np.zeros((self.rows, self.cols, 4), dtype=np.uint8)
+        for pheromone_type, grid in zip(self.type_names, self.grids):
+            color = COLOR.PHEROMONE_SEARCH if pheromone_type == 'search' else COLOR.PHEROMONE_RETURN
+            alpha = np.minimum(255, grid * 255).astype(np.uint8)
+            stronger = alpha > rgba[..., 3]
+            rgba[stronger, :3] = color
+            rgba[stronger, 3] = alpha[stronger]
+
+        overlay = pygame.image.frombuffer(rgba.tobytes(), (self.cols, self.rows), 'RGBA')
+        overlay = pygame.transform.scale(overlay, (self.cols * self.resolution, self.rows * self.resolution))
+        screen.blit(overlay, (0, 0))
+
+    def get_state(self):
+        """Get all grids as arrays (for snapshots)"""
+        return {'grids': np.stack(self.grids), 'type_names': np.array(self.type_names)}
+
+    def set_state(self, state):
+        """Restore grids saved by get_state"""
+        self.type_names = state['type_names'].tolist()
+        self.type_codes = {name: code for code, name in enumerate(self.type_names)}
+        self.grids = [grid.copy() for grid in state['grids']]
+
+    def get_count(self):
+        """Get the number of non-empty cells"""
+        return sum(int(np.count_nonzero(grid)) for grid in self.grids)
+
+    def get_count_by_type(self, pheromone_type):
+        """Get the number of non-empty cells of a specific type"""
+        grid = self._get_grid(pheromone_type)
+        return 0 if grid is None else int(np.count_nonzero(grid))
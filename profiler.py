@@ -0,0 +1,150 @@
+import time
+import json
+import functools
+from collections import deque
+
+class _NullPhase:
+    """Phase timer used while profiling is disabled - does nothing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """Times one run of a phase and adds it to the profiler"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start, self.start)
+        return False
+
+
+class Profiler:
+    """
+    Lightweight instrumentation of the simulation phases.
+    Use `with profiler.phase('vision'):` (or the profiler.timed decorator) around
+    a phase and profiler.count() for per-tick counters. While disabled the
+    context manager is a shared no-op object, so instrumentation costs almost nothing.
+
+    Measurements are kept as running totals, as a rolling window of the last
+    `window` ticks (see get_stats and draw_overlay) and, with trace=True, as
+    events that export_trace writes in the Chrome trace format.
+    """
+    def __init__(self, enabled=False, window=120, trace=False, max_trace_events=1000000):
+        self.enabled = enabled
+        self.totals = {}  # phase -> total seconds
+        self.calls = {}  # phase -> number of timed runs
+        self.history = deque(maxlen=window)  # (phase seconds, counters) of each finished tick
+        self.tick_times = {}
+        self.tick_counts = {}
+        self.trace = trace
+        self.max_trace_events = max_trace_events
+        self.trace_events = []
+        self.origin = time.perf_counter()
+
+    def phase(self, name):
+        """Get a context manager timing one run of a phase"""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as a phase"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.phase(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _add_event(self, event):
+        """Record a trace event while tracing, up to max_trace_events"""
+        if self.trace and len(self.trace_events) < self.max_trace_events:
+            self.trace_events.append(event)
+
+    def add_time(self, name, seconds, start=None):
+        """Add a measured duration to a phase"""
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.tick_times[name] = self.tick_times.get(name, 0.0) + seconds
+        if start is not None:
+            self._add_event({'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                             'ts': (start - self.origin) * 1e6, 'dur': seconds * 1e6})
+
+    def count(self, name, value):
+        """Record the value of a counter for the current tick"""
+        if not self.enabled:
+            return
+        self.tick_counts[name] = value
+        self._add_event({'name': name, 'ph': 'C', 'pid': 0,
+                         'ts': (time.perf_counter() - self.origin) * 1e6, 'args': {name: value}})
+
+    def end_tick(self):
+        """Close the current tick and add it to the rolling window"""
+        if not self.enabled:
+            return
+        self.history.append((self.tick_times, self.tick_counts))
+        self.tick_times = {}
+        self.tick_counts = {}
+
+    def get_stats(self):
+        """
+        Get rolling statistics over the last window ticks:
+        {'phases': {name: {'mean_ms', 'max_ms', 'last_ms'}}, 'counters': {name: {'mean', 'max', 'last'}}}
+        """
+        phases = {}
+        counters = {}
+        for samples, target, scale, suffix in ((0, phases, 1000.0, '_ms'), (1, counters, 1.0, '')):
+            names = {}
+            for tick in self.history:
+                for name in tick[samples]:
+                    names.setdefault(name, None)
+            for name in names:
+                values = [tick[samples].get(name, 0.0) * scale for tick in self.history]
+                target[name] = {
+                    'mean' + suffix: sum(values) / len(values),
+                    'max' + suffix: max(values),
+                    'last' + suffix: values[-1]
+                }
+        return {'phases': phases, 'counters': counters}
+
+    def reset(self):
+        """Forget all measurements"""
+        self.totals.clear()
+        self.calls.clear()
+        self.history.clear()
+        self.tick_times = {}
+        self.tick_counts = {}
+        self.trace_events = []
+
+    def export_trace(self, path):
+        """Write the recorded events as a Chrome trace (chrome://tracing or Perfetto)"""
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': self.trace_events, 'displayTimeUnit': 'ms'}, trace_file)
+
+    def draw_overlay(self, screen, font, x, y):
+        """Draw the rolling phase times and counters as text"""
+        stats = self.get_stats()
+        lines = [f"{name}: {values['mean_ms']:.2f} ms (max {values['max_ms']:.2f})"
+                 for name, values in stats['phases'].items()]
+        lines += [f"{name}: {values['last']:.1f}" for name, values in stats['counters'].items()]
+        for line in lines:
+            text = font.render(line, True, (0, 0, 0))
+            screen.blit(text, (x, y))
+            y += 25
@@ -0,0 +1,95 @@
+import pygame
+import numpy as np
+from ant import ANT_SPRITES
+from parameters import COLOR
+from scheduler import FixedTimestep
+
+class Renderer:
+    """
+    Pygame window attached to a Simulation.
+    Draws the simulation state; the simulation itself never touches the display.
+    """
+    def __init__(self, simulation, caption="Ant Simulation", show_profiler=False):
+        self.simulation = simulation
+        # Live performance overlay, toggled with F3 (turns the simulation profiler on)
+        self.show_profiler = show_profiler
+        if show_profiler:
+            simulation.profiler.enabled = True
+        pygame.init()
+        self.screen = pygame.display.set_mode((simulation.width, simulation.height))
+        pygame.display.set_caption(caption)
+
+        # Font for statistics
+        self.font = pygame.font.Font(None, 24)
+        self.clock = pygame.time.Clock()
+        self.scheduler = None
+        self.fast_forward = False
+
+    def handle_events(self):
+        """Process window events, returns False once the window is closed"""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_profiler = not self.show_profiler
+                if self.show_profiler:
+                    self.simulation.profiler.enabled = True
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+                self.fast_forward = not self.fast_forward
+        return True
+
+    def draw(self):
+        """Draw the current simulation state and flip the display"""
+        simulation = self.simulation
+        with simulation.profiler.phase('render'):
+            self._draw_world()
+        pygame.display.flip()
+
+    def _draw_world(self):
+        """Draw pheromones, hill, ants, food and statistics onto the screen"""
+        simulation = self.simulation
+        self.screen.fill(COLOR.GROUND)
+
+        # Draw pheromones first (behind everything)
+        simulation.pheromone_manager.draw(self.screen, simulation.scale)
+
+        # Draw the ant hill first (so it appears behind ants)
+        simulation.ant_hill.draw(self.screen)
+
+        # Draw the whole colony with one batched blit
+        if simulation.ants:
+            ANT_SPRITES.draw(self.screen,
+                             np.array([(ant.position.x, ant.position.y) for ant in simulation.ants]),
+                             [ant.rotation for ant in simulation.ants],
+                             [ant.carrying_food for ant in simulation.ants],
+                             simulation.scale)
+        if simulation.swarm is not None:
+            simulation.swarm.draw(self.screen)
+
+        # Draw all food groups
+        for group in simulation.food_groups:
+            group.draw(self.screen, simulation.scale)
+
+        # Draw statistics
+        simulation.ant_hill.draw_statistics(self.screen, self.font)
+        if self.show_profiler:
+            simulation.profiler.draw_overlay(self.screen, self.font, 200, 10)
+
+    def run(self, fps=60, tick_rate=60, speed=1.0, fast_forward=8):
+        """
+        Step and draw the simulation until the window is closed.
+        The simulation advances in fixed ticks of 1 / tick_rate seconds at
+        `speed` times real time, independent of fps; F toggles fast-forward,
+        which runs fast_forward times as many ticks per rendered frame.
+        """
+        self.scheduler = FixedTimestep(tick_rate, speed)
+        running = True
+        while running:
+            frame_seconds = self.clock.tick(fps) / 1000.0
+            running = self.handle_events()
+            self.scheduler.speed = speed * (fast_forward if self.fast_forward else 1)
+            for _ in range(self.scheduler.advance(frame_seconds)):
+                self.simulation.step(self.scheduler.dt)
+            self.draw()
+
+        pygame.quit()
@@ -0,0 +1,201 @@
+import argparse
+import sys
+import numpy as np
+import pygame
+from ant import ANT_SPRITES
+from anthill import AntHill
+from foodgroup import FoodGroup
+from parameters import COLOR
+from pheromone import PheromoneManager, PheromoneField
+from telemetry import TelemetryReader
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a telemetry recording without re-simulating")
+    parser.add_argument('recording', help="recording written with main.py --record (e.g. run.antrec)")
+    parser.add_argument('--speed', type=float, default=1.0, help="initial playback speed")
+    parser.add_argument('--fps', type=int, default=60, help="display frame rate")
+    parser.add_argument('--tick-rate', type=int, default=60, help="recorded ticks per second at speed 1")
+    parser.add_argument('--start', type=int, default=0, help="tick to start playing from")
+    return parser.parse_args(argv)
+
+
+class Replay:
+    """
+    Pygame window playing back a TelemetryReader recording.
+    Recorded frames are loaded lazily into lightweight stand-ins for the
+    simulation objects (hill, food groups, pheromone backend), so the regular
+    draw methods render them. Controls: SPACE pause, LEFT/RIGHT step one
+    frame (PAGE UP/DOWN 10%), UP/DOWN double/halve the speed, HOME/END jump
+    to the ends, click or drag the bar at the bottom to scrub.
+    """
+    BAR_HEIGHT = 12
+
+    def __init__(self, reader, caption="Ant Simulation - Replay"):
+        self.reader = reader
+        config = reader.config
+        self.width = config['width']
+        self.height = config['height']
+        self.scale = config['scale']
+
+        hill_x, hill_y, hill_radius = reader.static.meta['hill']
+        self.ant_hill = AntHill(hill_x, hill_y, hill_radius)
+        self.food_groups = {group_id: FoodGroup(group_id, 0, 0, 0) for group_id in reader.static.meta['group_ids']}
+        if config['pheromone_mode'] == 'field':
+            self.pheromone_manager = PheromoneField(self.width, self.height, resolution=10)
+        else:
+            self.pheromone_manager = PheromoneManager()
+        self.food_alive = None
+        self.frame = None
+        self.frame_index = -1
+
+        self.tick = float(reader.ticks[0]) if len(reader) else 0.0
+        self.speed = 1.0
+        self.paused = False
+        self.scrubbing = False
+
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption(caption)
+        self.font = pygame.font.Font(None, 24)
+        self.clock = pygame.time.Clock()
+
+    def load_frame(self, index):
+        """Show a recorded frame (only the arrays that changed are copied out of the recording)"""
+        index = min(max(0, index), len(self.reader) - 1)
+        if index == self.frame_index:
+            return
+        frame = self.reader[index]
+        self.frame = frame
+        self.frame_index = index
+
+        self.ant_hill.total_food_collected = frame.meta['total']
+        self.ant_hill.food_by_group = {int(group): count for group, count in frame.meta['by_group'].items()}
+
+        # Refill the food groups only when food was eaten since the shown frame
+        alive = frame['food_alive']
+        if self.food_alive is None or not np.array_equal(alive, self.food_alive):
+            static = self.reader.static
+            for group in self.food_groups.values():
+                group.clear()
+            ids = np.flatnonzero(alive)
+            for food_id, x, y, group_id in zip(ids.tolist(), static['food_x'][ids].tolist(),
+                                               static['food_y'][ids].tolist(), static['food_group'][ids].tolist()):
+                self.food_groups[group_id].add_food(food_id, x, y)
+            self.food_alive = alive
+
+        type_names = np.array(frame.meta['pheromone_types'])
+        if 'pheromone_grids' in frame.arrays:
+            self.pheromone_manager.set_state({'grids': frame['pheromone_grids'], 'type_names': type_names})
+        elif 'pheromone_x' in frame.arrays:
+            state = {name: frame['pheromone_' + name] for name in PheromoneManager.ARRAYS}
+            state['type_names'] = type_names
+            state['indexed_count'] = 0
+            self.pheromone_manager.set_state(state)
+
+    def seek(self, tick):
+        """Jump to the last frame recorded at or before a tick"""
+        if not len(self.reader):
+            return
+        ticks = self.reader.ticks
+        self.tick = float(min(max(tick, ticks[0]), ticks[-1]))
+        self.load_frame(self.reader.frame_at_tick(self.tick))
+
+    def step_frames(self, count):
+        """Move a number of frames forward (or back) and pause there"""
+        if not len(self.reader):
+            return
+        index = min(max(0, self.frame_index + count), len(self.reader) - 1)
+        self.paused = True
+        self.seek(self.reader.ticks[index])
+
+    def _scrub_to(self, x):
+        """Seek to the tick under a horizontal position of the scrub bar"""
+        ticks = self.reader.ticks
+        fraction = min(max(x / self.width, 0.0), 1.0)
+        self.seek(ticks[0] + fraction * (ticks[-1] - ticks[0]))
+
+    def handle_events(self):
+        """Process window events, returns False once the window is closed"""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    self.paused = not self.paused
+                elif event.key == pygame.K_RIGHT:
+                    self.step_frames(1)
+                elif event.key == pygame.K_LEFT:
+                    self.step_frames(-1)
+                elif event.key == pygame.K_PAGEDOWN:
+                    self.step_frames(max(1, len(self.reader) // 10))
+                elif event.key == pygame.K_PAGEUP:
+                    self.step_frames(-max(1, len(self.reader) // 10))
+                elif event.key == pygame.K_UP:
+                    self.speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    self.speed /= 2
+                elif event.key == pygame.K_HOME:
+                    self.seek(0)
+                elif event.key == pygame.K_END:
+                    self.seek(self.reader.ticks[-1] if len(self.reader) else 0)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] >= self.height - self.BAR_HEIGHT * 2:
+                self.scrubbing = True
+                self._scrub_to(event.pos[0])
+            elif event.type == pygame.MOUSEMOTION and self.scrubbing:
+                self._scrub_to(event.pos[0])
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.scrubbing = False
+        return True
+
+    def draw(self):
+        """Draw the shown frame with the regular draw methods, plus the playback bar"""
+        self.screen.fill(COLOR.GROUND)
+        self.pheromone_manager.draw(self.screen, self.scale)
+        self.ant_hill.draw(self.screen)
+        if self.frame is not None:
+            ANT_SPRITES.draw(self.screen, self.frame['ant_position'], self.frame['ant_rotation'],
+                             self.frame['ant_carrying'], self.scale)
+        for group in self.food_groups.values():
+            group.draw(self.screen, self.scale)
+        self.ant_hill.draw_statistics(self.screen, self.font)
+
+        # Playback bar and position
+        top = self.height - self.BAR_HEIGHT
+        pygame.draw.rect(self.screen, (60, 60, 60), (0, top, self.width, self.BAR_HEIGHT))
+        if len(self.reader) > 1:
+            fraction = self.frame_index / (len(self.reader) - 1)
+            pygame.draw.rect(self.screen, (220, 220, 220), (0, top, int(self.width * fraction), self.BAR_HEIGHT))
+        tick = self.frame.tick if self.frame is not None else 0
+        state = "paused" if self.paused else f"x{self.speed:g}"
+        text = self.font.render(f"Tick {tick} / {self.reader.ticks[-1] if len(self.reader) else 0}  {state}",
+                                True, (0, 0, 0))
+        self.screen.blit(text, (10, top - 25))
+        pygame.display.flip()
+
+    def run(self, fps=60, tick_rate=60, speed=1.0, start=0):
+        """Play the recording until the window is closed"""
+        self.speed = speed
+        self.seek(start)
+        running = True
+        while running:
+            frame_seconds = self.clock.tick(fps) / 1000.0
+            running = self.handle_events()
+            if not self.paused and not self.scrubbing and len(self.reader):
+                self.seek(self.tick + frame_seconds * tick_rate * self.speed)
+            self.draw()
+        pygame.quit()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with TelemetryReader(args.recording) as reader:
+        replay = Replay(reader)
+        replay.run(args.fps, args.tick_rate, args.speed, args.start)
+        # Drop the frame views before the recording is unmapped
+        replay.frame = None
+        replay.food_alive = None
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,24 @@
+class FixedTimestep:
+    """
+    Accumulator turning variable frame times into whole fixed-size simulation ticks.
+    Every frame adds its wall-clock time (times `speed`) to the accumulator and
+    runs as many ticks of 1 / tick_rate seconds as fit, so the simulation
+    advances the same way whatever the display frame rate is. With speed N
+    (fast-forward) a frame runs about N times as many ticks and rendering
+    happens only once per frame.
+    Frame times are capped at max_frame_time, so a slow frame or a stalled
+    window does not snowball into ever longer catch-up bursts.
+    """
+    def __init__(self, tick_rate=60, speed=1.0, max_frame_time=0.25):
+        self.dt = 1.0 / tick_rate
+        self.speed = speed
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+    def advance(self, frame_seconds):
+        """Add the wall-clock time of one frame, returns the number of ticks to run"""
+        self.accumulator += min(frame_seconds, self.max_frame_time) * self.speed
+        # The small epsilon keeps rounding from delaying a tick that is exactly due
+        ticks = int(self.accumulator / self.dt + 1e-9)
+        self.accumulator -= ticks * self.dt
+        return ticks
@@ -0,0 +1,473 @@
+import pygame
+import random
+import math
+import json
+import numpy as np
+from ant import Ant, AntSpecies
+from anthill import AntHill, HillField
+from foodgroup import FoodGroup
+from foodindex import FoodIndex
+from pheromone import PheromoneManager, PheromoneField
+from swarm import Swarm
+from profiler import Profiler
+from pathmemory import PathMemory
+from homing import HomingTrips
+from trails import best_trail_directions
+
+class Simulation:
+    """
+    The ant colony world without any rendering.
+    Holds the ant hill, ants, food groups and pheromones and advances them
+    one tick at a time with step(), so it can run windowed, headless or in batch.
+    Ants are either individual Ant objects (engine='ants') or one vectorized
+    Swarm (engine='swarm') for large colonies.
+    All randomness comes from generators seeded with `seed`, so runs are
+    reproducible, and the full state can be saved to and restored from a
+    compact binary snapshot.
+    """
+    def __init__(self, width=1000, height=1000, ant_count=75, food_count=1500,
+                 scale=0.5, pheromone_mode='points', engine='ants', seed=None,
+                 evaporation_rate=1, influence_radius=80, workers=0, merge_radius=0):
+        self.config = {
+            'width': width, 'height': height, 'ant_count': ant_count, 'food_count': food_count,
+            'scale': scale, 'pheromone_mode': pheromone_mode, 'engine': engine, 'seed': seed,
+            'evaporation_rate': evaporation_rate, 'influence_radius': influence_radius, 'workers': workers,
+            'merge_radius': merge_radius
+        }
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.ticks = 0
+        self.time = 0.0
+        # Per-phase timing, disabled (and nearly free) unless profiler.enabled is set
+        self.profiler = Profiler()
+        # Optional telemetry.TelemetryWriter fed after every tick
+        self.recorder = None
+
+        # Create the ant hill (mrowisko) close to center but asymmetric
+        self.ant_hill = AntHill(width // 2 + 80, height // 2 - 60, radius=40)
+        # All hills of the colony (ant_hill is the first) and their nearest-hill lookup
+        self.ant_hills = [self.ant_hill]
+        self.hill_field = HillField(self.ant_hills)
+
+        # Pheromone backend: 'points' keeps individual markers, 'field' uses a fixed-resolution grid
+        # (merge_radius > 0 coalesces nearby 'points' deposits, grid cells already do)
+        if pheromone_mode == 'field':
+            self.pheromone_manager = PheromoneField(width, height, resolution=10, evaporation_rate=evaporation_rate,
+                                                    influence_radius=influence_radius)
+        else:
+            self.pheromone_manager = PheromoneManager(evaporation_rate=evaporation_rate,
+                                                      influence_radius=influence_radius, merge_radius=merge_radius)
+
+        self.ants = []
+        self.swarm = None
+        self.species = None  # AntSpecies shared by all ants (Ant objects or the swarm)
+        self.path_memory = None  # Colony-wide path ring buffers of Ant objects
+        self.trips = None  # Closed-form return trips of food-carrying Ant objects
+        # Swarm steering split into map tiles stepped by worker processes (see parallel.TiledStepper)
+        self.stepper = None
+        if engine == 'swarm':
+            self.swarm = self._create_swarm(ant_count)
+            if workers > 1:
+                from parallel import TiledStepper
+                self.stepper = TiledStepper(workers)
+        else:
+            self.ants = self._create_ants(ant_count)
+        self.food_groups = self._create_food_groups(food_count)
+        # Cells as wide as the ant view distance, so a vision query touches at most 3x3 cells
+        self.food_index = FoodIndex(self.food_groups, cell_size=70 * scale)
+
+    def _create_ants(self, ant_count):
+        """Create ants at the ant hill location with highly asymmetric initial states"""
+        hill = self.ant_hill.position
+        rng = self.rng
+        # Behaviour constants shared by every ant
+        self.species = AntSpecies(self.scale)
+        # One ring buffer array for the paths of the whole colony
+        self.path_memory = PathMemory(ant_count, self.species.max_path_memory)
+        ants = [Ant(hill.x, hill.y, self.scale, self.width, self.height, rng, self.species, self.path_memory, i)
+                for i in range(ant_count)]
+        self.trips = HomingTrips(ant_count)
+        for i, ant in enumerate(ants):
+            ant.set_ant_hill(self.ant_hill)
+            ant.set_pheromone_manager(self.pheromone_manager)
+
+            # Highly asymmetric initialization
+            # Use different random distributions for each ant
+            random_angle = rng.gauss(0, 3)  # Gaussian distribution for angle clustering
+            random_speed = rng.triangular(ant.maxSpeed * 0.3, ant.maxSpeed * 1.2, ant.maxSpeed * 0.6)
+
+            # Add chaos with prime number offset for each ant
+            chaos_offset = (i * 37) % 360  # Prime-based offset
+            random_angle += math.radians(chaos_offset)
+
+            ant.velocity = pygame.math.Vector2(
+                random_speed * math.cos(random_angle),
+                random_speed * math.sin(random_angle)
+            )
+            ant.desiredDirection = ant.velocity.normalize()
+
+            # Highly varied rotation
+            ant.rotation = rng.gauss(0, 120)
+
+            # Randomize wander strength per ant for different exploration patterns
+            ant.wanderStrength = rng.uniform(0.2, 1.5)
+        return ants
+
+    def _create_swarm(self, ant_count):
+        """Create a swarm at the ant hill location with the same initial distributions as _create_ants"""
+        hill = self.ant_hill.position
+        self.species = AntSpecies(self.scale)
+        swarm = Swarm(ant_count, hill.x, hill.y, self.scale, self.width, self.height, self.np_rng, self.species)
+        swarm.set_ant_hills(self.ant_hills)
+        swarm.set_pheromone_manager(self.pheromone_manager)
+
+        rng = swarm.rng
+        max_speed = swarm.maxSpeed
+        random_angle = rng.normal(0, 3, ant_count) + np.radians((np.arange(ant_count) * 37) % 360)
+        random_speed = rng.triangular(max_speed * 0.3, max_speed * 0.6, max_speed * 1.2, ant_count)
+        swarm.velocity = np.stack((random_speed * np.cos(random_angle), random_speed * np.sin(random_angle)), axis=1)
+        swarm.desired_direction = swarm.velocity / random_speed[:, None]
+        swarm.rotation = rng.normal(0, 120, ant_count)
+        swarm.wander_strength = rng.uniform(0.2, 1.5, ant_count)
+        return swarm
+
+    def set_ant_parameter(self, name, value):
+        """
+        Set a per-ant behaviour parameter (an Ant attribute name such as
+        'wanderStrength' or 'pheromone_follow_probability') on every ant
+        """
+        if name in AntSpecies.__slots__:
+            setattr(self.species, name, value)
+        elif self.swarm is None:
+            for ant in self.ants:
+                setattr(ant, name, value)
+        elif name == 'wanderStrength':
+            self.swarm.wander_strength[:] = value
+        else:
+            setattr(self.swarm, name, value)
+
+    def _create_food_groups(self, food_count):
+        """Create 5 food groups asymmetrically placed on the map"""
+        width, height, rng = self.width, self.height, self.rng
+        food_per_group = food_count // 5
+        return [
+            # Group Green: Close to anthill, upper-left
+            FoodGroup(0, 380, 280, food_per_group, spread_radius=80, rng=rng),
+            # Group Red: Far, top-right area
+            FoodGroup(1, width - 180, 200, food_per_group, spread_radius=80, rng=rng),
+            # Group Blue: Medium distance, left side
+            FoodGroup(2, 200, height - 300, food_per_group, spread_radius=80, rng=rng),
+            # Group Yellow: Close to anthill, right side
+            FoodGroup(3, 750, 520, food_per_group, spread_radius=80, rng=rng),
+            # Group Purple: Far, bottom area
+            FoodGroup(4, width // 2 - 100, height - 120, food_per_group, spread_radius=80, rng=rng),
+        ]
+
+    def step(self, deltaTime):
+        """Advance the simulation by one tick"""
+        # Update pheromones (evaporation)
+        with self.profiler.phase('pheromones'):
+            self.pheromone_manager.update(deltaTime)
+
+        if self.swarm is not None:
+            self._step_swarm(deltaTime)
+        else:
+            self._step_ants(deltaTime)
+
+        self.ticks += 1
+        self.time += deltaTime
+        if self.profiler.enabled:
+            self._record_counters()
+            self.profiler.end_tick()
+        if self.recorder is not None:
+            self.recorder.record(self)
+
+    def _record_counters(self):
+        """Record this tick's work counters and reset the counters kept by the world"""
+        profiler = self.profiler
+        manager = self.pheromone_manager
+        ant_count = self.swarm.count if self.swarm is not None else len(self.ants)
+        profiler.count('pheromone count', manager.get_count())
+        profiler.count('food checked / ant', self.food_index.candidates_checked / max(1, ant_count))
+        profiler.count('pheromones scanned / query', manager.scanned / max(1, manager.queries))
+        self.food_index.candidates_checked = 0
+        manager.queries = 0
+        manager.scanned = 0
+
+    def _step_ants(self, deltaTime):
+        """
+        Advance every Ant object by one tick.
+        Vision is one batched query over the food as it is at the start of the
+        tick. Every ant applies its result right after its own pickup, and an
+        ant whose food was taken by an ant before it looks again (see
+        Ant.seeFoodIndex), so every ant sees the food left by the ants before
+        it, as in the original per-ant loop.
+        Food-carrying ants travel home as trips (see _begin_trip) and all of
+        their pheromones are dropped after the searching ants have moved, so
+        no searching ant sees the drops of the current tick. In the per-tick
+        loop it saw the drops of the carrying ants before it, so this order
+        changed seeded results when trips came in.
+        """
+        profiler = self.profiler
+        trips = self.trips
+        with profiler.phase('pickup'):
+            # Ants whose return trip reached the hill take part in this tick again
+            for i in trips.arrived().tolist():
+                self._finish_trip(i, self.ants[i])
+
+        with profiler.phase('vision'):
+            # Ants do not move until steering, so one position array serves vision and pickup
+            positions = np.array([(ant.position.x, ant.position.y) for ant in self.ants]).reshape(-1, 2)
+            looking = np.flatnonzero(~trips.active)
+            ants = [self.ants[i] for i in looking.tolist()]
+            velocities = np.array([(ant.velocity.x, ant.velocity.y) for ant in ants]).reshape(-1, 2)
+            view_distances = np.array([ant.species.viewDistance for ant in ants])
+            view_angle = ants[0].species.viewAngle if ants else 0.0
+            visible_food = self.food_index.find_visible_batch(positions[looking], velocities, view_distances, view_angle)
+
+        with profiler.phase('pickup'):
+            # One nearest-hill query serves deposits, trail scoring and steering
+            nearest, to_hill, hill_distance = self.hill_field.query(positions)
+            at_hill = hill_distance < 50
+            hills = self.ant_hills
+            for i, ant, visible_food_id in zip(looking.tolist(), ants, visible_food.tolist()):
+                if len(hills) > 1:
+                    # Every ant returns to (and deposits at) its nearest hill
+                    ant.ant_hill = hills[nearest[i]]
+                # Check if ant reached food (increased collision radius)
+                if not ant.carrying_food and ant.seenFood is not None:
+                    food_id = self.food_index.find(ant.seenFood)
+                    if food_id is not None and (ant.position - ant.seenFood).length() < 15:  # Increased from 5 to 15
+                        ant.pickup_food(self.food_index.remove(food_id))
+
+                # Check if ant carrying food reached the ant hill, otherwise send it home in closed form
+                if ant.carrying_food:
+                    if at_hill[i]:
+                        ant.deposit_food()
+                    else:
+                        self._begin_trip(i, ant, deltaTime)
+                ant.seeFoodIndex(self.food_index, visible_food_id)
+
+            # Ants that just set off home skip steering like the ones already travelling
+            looking = np.flatnonzero(~trips.active)
+            ants = [self.ants[i] for i in looking.tolist()]
+
+        with profiler.phase('steering'):
+            to_hill = to_hill[looking]
+            # Lengths as sqrt(x * x + y * y), like Vector2.length in Ant.update
+            hill_distance = np.sqrt(to_hill[:, 0] * to_hill[:, 0] + to_hill[:, 1] * to_hill[:, 1])
+            trails = self._score_trails(ants, positions[looking], to_hill, hill_distance)
+            for ant, trail, offset, distance in zip(ants, trails, to_hill.tolist(), hill_distance.tolist()):
+                ant.update(deltaTime, trail, offset, distance)
+
+            # Returning ants: one batch of pheromone drops and positions for all of them
+            drops, ids, positions = trips.advance()
+            if len(drops) and self.pheromone_manager is not None:
+                self.pheromone_manager.add_pheromones(drops[:, 0], drops[:, 1], 'return', strength=3.0)
+            for i, x, y in zip(ids.tolist(), positions[:, 0].tolist(), positions[:, 1].tolist()):
+                self.ants[i].position.update(x, y)
+
+    def _score_trails(self, ants, positions, to_hill, distance):
+        """
+        Score the pheromone trails of every searching ant far enough from its hill
+        (given the offsets to their hills and the lengths) in one batch, returns
+        the `trail` argument of Ant.update for each ant
+        """
+        trails = [None] * len(ants)
+        manager = self.pheromone_manager
+        if manager is None or not ants:
+            return trails
+        species = self.species
+        searching = np.array([ant.seenFood is None and not ant.carrying_food for ant in ants])
+        scoring = np.flatnonzero(searching & (distance > species.min_distance_to_follow))
+        if not len(scoring):
+            return trails
+
+        lasts = [ants[i].last_pheromone_direction for i in scoring.tolist()]
+        last_directions = np.array([(v.x, v.y) if v else (0.0, 0.0) for v in lasts]).reshape(-1, 2)
+        has_last = np.array([bool(v) for v in lasts], dtype=bool)
+        offsets, xs, ys, strengths = manager.get_nearby_batch(positions[scoring], 'return', manager.influence_radius)
+        directions, _, found = best_trail_directions(
+            positions[scoring], to_hill[scoring], last_directions, has_last, offsets, xs, ys, strengths,
+            (species.trail_away_weight, species.trail_strength_weight, species.trail_momentum_weight)
+        )
+        for i, direction, follow in zip(scoring.tolist(), directions.tolist(), found.tolist()):
+            trails[i] = pygame.math.Vector2(direction) if follow else False
+        return trails
+
+    def _begin_trip(self, i, ant, deltaTime):
+        """
+        Schedule the straight walk home of a food-carrying ant (see homing.HomingTrips).
+        When the trip has no closed form (no movement, or steps wider than the hill's
+        arrival disk) the ant stays on the per-tick path of Ant.update.
+        """
+        hill = ant.ant_hill
+        species = ant.species
+        trips = self.trips
+        arrival = trips.begin(i, (ant.position.x, ant.position.y), (hill.position.x, hill.position.y), hill.radius,
+                              species.maxSpeed, deltaTime, ant.pheromone_deposit_timer,
+                              species.pheromone_deposit_interval)
+        if arrival is None:
+            return
+        # Heading and velocity stay fixed for the whole trip
+        ant.desiredDirection = (hill.position - ant.position).normalize()
+        ant.velocity = ant.desiredDirection * species.maxSpeed
+        ant.rotation = ant.velocity.angle_to(pygame.math.Vector2(1, 0))
+
+    def _finish_trip(self, i, ant):
+        """Hand an ant whose trip reached the hill back to Ant.update, depositing its food"""
+        position, velocity, timer, distance = self.trips.finish(i)
+        ant.position.update(position)
+        ant.velocity = pygame.math.Vector2(velocity)
+        if ant.velocity.length() > 0:
+            ant.rotation = ant.velocity.angle_to(pygame.math.Vector2(1, 0))
+        ant.pheromone_deposit_timer = timer
+        ant.distance_from_hill = distance
+        ant.deposit_food()
+
+    def _step_swarm(self, deltaTime):
+        """Advance the whole swarm by one tick"""
+        swarm = self.swarm
+        profiler = self.profiler
+
+        with profiler.phase('pickup'):
+            # Check if ants reached the food they see
+            reaching = ~swarm.carrying_food & swarm.sees_food()
+            reaching[reaching] = np.hypot(*(swarm.position[reaching] - swarm.seen_food[reaching]).T) < 15
+            for i in np.flatnonzero(reaching).tolist():
+                food_id = int(swarm.seen_food_id[i])
+                if self.food_index.is_alive(food_id):
+                    swarm.pickup_food(i, self.food_index.remove(food_id))
+
+            # Ants do not move until steering, so one nearest-hill query serves deposits,
+            # path recording and steering
+            hills = swarm.hill_field.query(swarm.position)
+            nearest, _, distance = hills
+            # Check if ants carrying food reached the ant hill
+            swarm.deposit_food(np.flatnonzero(swarm.carrying_food & (distance < 50)), nearest)
+
+        with profiler.phase('vision'):
+            swarm.see_food(self.food_index)
+
+        with profiler.phase('steering'):
+            swarm.record_path(distance)
+            if self.stepper is not None and swarm.count >= self.stepper.min_ants:
+                self.stepper.update(swarm, deltaTime)
+            else:
+                swarm.update(deltaTime, hills)
+
+    def run(self, ticks, deltaTime):
+        """Run a fixed number of ticks with a fixed timestep"""
+        for _ in range(ticks):
+            self.step(deltaTime)
+
+    def close(self):
+        """Release the worker processes of a tiled swarm and finish the telemetry recording, if any"""
+        if self.stepper is not None:
+            self.stepper.close()
+            self.stepper = None
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def _get_ants_state(self):
+        """Get the state of all Ant objects as arrays (NaN / -1 for None)"""
+        ants = self.ants
+
+        def vectors(values):
+            return np.array([(v.x, v.y) if v is not None else (np.nan, np.nan) for v in values]).reshape(-1, 2)
+
+        state = {
+            'position': vectors(ant.position for ant in ants),
+            'velocity': vectors(ant.velocity for ant in ants),
+            'desired_direction': vectors(ant.desiredDirection for ant in ants),
+            'rotation': np.array([ant.rotation for ant in ants]),
+            'wander_strength': np.array([ant.wanderStrength for ant in ants]),
+            'seen_food': vectors(ant.seenFood for ant in ants),
+            'carrying_food': np.array([ant.carrying_food for ant in ants], dtype=bool),
+            'food_group_id': np.array([-1 if ant.food_group_id is None else ant.food_group_id for ant in ants],
+                                      dtype=np.int64),
+            'pheromone_deposit_timer': np.array([ant.pheromone_deposit_timer for ant in ants]),
+            'distance_from_hill': np.array([ant.distance_from_hill for ant in ants]),
+            'last_pheromone_direction': vectors(ant.last_pheromone_direction for ant in ants),
+            'steps_since_food': np.array([ant.steps_since_food for ant in ants], dtype=np.int64)
+        }
+        # Path memory of all ants, concatenated, plus the number of points of each ant
+        state.update(self.path_memory.get_state())
+        state.update(self.trips.get_state())
+        return state
+
+    def _set_ants_state(self, state):
+        """Restore Ant objects from arrays saved by _get_ants_state"""
+        def vector(row):
+            return None if np.isnan(row[0]) else pygame.math.Vector2(*row.tolist())
+
+        self.path_memory.set_state(state)
+        if 'trip_active' in state:
+            self.trips.set_state(state)
+        for i, ant in enumerate(self.ants):
+            ant.position = vector(state['position'][i])
+            ant.velocity = vector(state['velocity'][i])
+            ant.desiredDirection = vector(state['desired_direction'][i])
+            ant.rotation = float(state['rotation'][i])
+            ant.wanderStrength = float(state['wander_strength'][i])
+            ant.seenFood = vector(state['seen_food'][i])
+            ant.carrying_food = bool(state['carrying_food'][i])
+            group_id = int(state['food_group_id'][i])
+            ant.food_group_id = None if group_id < 0 else group_id
+            ant.pheromone_deposit_timer = float(state['pheromone_deposit_timer'][i])
+            ant.distance_from_hill = float(state['distance_from_hill'][i])
+            ant.last_pheromone_direction = vector(state['last_pheromone_direction'][i])
+            ant.steps_since_food = int(state['steps_since_food'][i])
+
+    def save_snapshot(self, path):
+        """Save the full simulation state to a compressed binary snapshot (.npz)"""
+        meta = {
+            'config': self.config,
+            'ticks': self.ticks,
+            'time': self.time,
+            'rng_state': self.rng.getstate(),
+            'np_rng_state': self.np_rng.bit_generator.state
+        }
+        arrays = {'meta': np.array(json.dumps(meta))}
+        parts = {
+            'hill': self.ant_hill.get_state(),
+            'pheromones': self.pheromone_manager.get_state(),
+            'food': self.food_index.get_state(),
+            'ants': self.swarm.get_state() if self.swarm is not None else self._get_ants_state()
+        }
+        for part, state in parts.items():
+            for name, array in state.items():
+                arrays[f'{part}.{name}'] = array
+        with open(path, 'wb') as snapshot_file:
+            np.savez_compressed(snapshot_file, **arrays)
+
+    @classmethod
+    def load_snapshot(cls, path):
+        """Create a simulation from a snapshot written by save_snapshot"""
+        with np.load(path) as snapshot:
+            arrays = {name: snapshot[name] for name in snapshot.files}
+        meta = json.loads(str(arrays.pop('meta')))
+        parts = {}
+        for key, array in arrays.items():
+            part, name = key.split('.', 1)
+            parts.setdefault(part, {})[name] = array
+
+        simulation = cls(**meta['config'])
+        simulation.ticks = meta['ticks']
+        simulation.time = meta['time']
+        simulation.ant_hill.set_state(parts['hill'])
+        simulation.pheromone_manager.set_state(parts['pheromones'])
+        simulation.food_index.set_state(parts['food'])
+        if simulation.swarm is not None:
+            simulation.swarm.set_state(parts['ants'])
+        else:
+            simulation._set_ants_state(parts['ants'])
+
+        version, internal_state, gauss_next = meta['rng_state']
+        simulation.rng.setstate((version, tuple(internal_state), gauss_next))
+        simulation.np_rng.bit_generator.state = meta['np_rng_state']
+        return simulation
@@ -0,0 +1,285 @@
+import numpy as np
+from ant import ANT_SPRITES, AntSpecies, _species_attribute
+from anthill import HillField
+from trails import best_trail_directions
+from pathmemory import PathMemory
+
+def _normalize(vectors):
+    """Normalize an (n, 2) array of vectors, leaving zero-length vectors at zero"""
+    length = np.hypot(vectors[:, 0], vectors[:, 1])
+    safe = np.where(length > 0, length, 1.0)
+    return vectors / safe[:, None]
+
+def _clamp_length(vectors, max_length):
+    """Scale down every vector longer than max_length to exactly max_length (in place)"""
+    length = np.hypot(vectors[:, 0], vectors[:, 1])
+    too_long = length > max_length
+    vectors[too_long] *= (max_length / length[too_long])[:, None]
+    return vectors
+
+
+class Swarm:
+    """
+    Structure-of-arrays engine that updates a whole colony at once.
+    Every per-ant attribute of Ant is one NumPy array indexed by ant id, and
+    update() applies the same rules as Ant.update to all ants with a few array
+    operations instead of one Python call per ant.
+    """
+    STATE = ('position', 'velocity', 'desired_direction', 'rotation', 'wander_strength',
+             'seen_food_id', 'seen_food', 'carrying_food', 'food_group_id', 'pheromone_deposit_timer',
+             'distance_from_hill', 'last_pheromone_direction', 'has_last_pheromone_direction',
+             'steps_since_food')
+    # Behaviour constants shared by all ants, stored on the swarm's AntSpecies
+    SETTINGS = AntSpecies.__slots__
+
+    def __init__(self, count, x, y, scale=1.0, map_width=1000, map_height=1000, rng=None, species=None):
+        self.count = count
+        self.scale = scale
+        self.map_width = map_width
+        self.map_height = map_height
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.species = species if species is not None else AntSpecies(scale)
+
+        # Per-ant state
+        self.position = np.tile(np.array([x, y], dtype=float), (count, 1))
+        self.velocity = np.tile(np.array([60.0, 0.0]), (count, 1))
+        self.desired_direction = np.tile(np.array([1.0, 0.0]), (count, 1))
+        self.rotation = np.zeros(count)
+        self.wander_strength = np.full(count, 0.5)
+        self.seen_food_id = np.full(count, -1, dtype=np.int64)  # FoodIndex id, -1 when no food is seen
+        self.seen_food = np.full((count, 2), np.nan)  # Position of the seen food, NaN when none
+        self.carrying_food = np.zeros(count, dtype=bool)
+        self.food_group_id = np.full(count, -1, dtype=np.int64)  # -1 when not carrying
+        self.pheromone_deposit_timer = np.zeros(count)
+        self.distance_from_hill = np.zeros(count)
+        self.last_pheromone_direction = np.zeros((count, 2))
+        self.has_last_pheromone_direction = np.zeros(count, dtype=bool)
+        self.steps_since_food = np.zeros(count, dtype=np.int64)
+        self._path_memory = None  # Created on first use, workers stepping a tile never need it
+
+        self.ant_hill = None
+        self.hill_field = None  # Nearest-hill lookup over all hills
+        self.pheromone_manager = None
+
+    @property
+    def path_memory(self):
+        """The PathMemory holding the path of every ant"""
+        if self._path_memory is None:
+            self._path_memory = PathMemory(self.count, self.max_path_memory)
+        return self._path_memory
+
+    def set_ant_hill(self, ant_hill):
+        """Set the ant hill shared by all ants"""
+        self.set_ant_hills([ant_hill])
+
+    def set_ant_hills(self, ant_hills):
+        """Set the ant hills of the colony, every ant returns to the nearest one"""
+        self.hill_field = HillField(ant_hills)
+        self.ant_hill = self.hill_field.hills[0]
+
+    def set_pheromone_manager(self, pheromone_manager):
+        """Set the pheromone manager shared by all ants"""
+        self.pheromone_manager = pheromone_manager
+
+    def get_state(self):
+        """Get all per-ant arrays and the path memory (for snapshots)"""
+        state = {name: getattr(self, name).copy() for name in self.STATE}
+        state.update(self.path_memory.get_state())
+        return state
+
+    def set_state(self, state):
+        """Restore per-ant arrays saved by get_state (paths start empty when not saved)"""
+        for name in self.STATE:
+            setattr(self, name, state[name].copy())
+        self.count = len(self.position)
+        self._path_memory = None
+        if 'path_lengths' in state:
+            self.path_memory.set_state(state)
+
+    def sees_food(self):
+        """Boolean mask of ants that currently see food"""
+        return self.seen_food_id >= 0
+
+    def see_food(self, food_index):
+        """
+        Update seen food for all ants in one batched vision query, like Ant.seeFoodIndex.
+        An ant that sees nothing new keeps its current food while it is still there.
+        """
+        carrying = self.carrying_food
+        seen = self.seen_food_id >= 0
+        gone = np.zeros(self.count, dtype=bool)
+        gone[seen] = carrying[seen] | ~food_index.alive[self.seen_food_id[seen]]
+        self.seen_food_id[gone] = -1
+        self.seen_food[gone] = np.nan
+
+        looking = np.flatnonzero(~carrying)
+        visible = food_index.find_visible_batch(
+            self.position[looking], self.velocity[looking], self.viewDistance, self.viewAngle
+        )
+        found = visible >= 0
+        ants, food_ids = looking[found], visible[found]
+        self.seen_food_id[ants] = food_ids
+        self.seen_food[ants, 0] = food_index.x[food_ids]
+        self.seen_food[ants, 1] = food_index.y[food_ids]
+
+    def pickup_food(self, index, group_id):
+        """Pick up food and remember which group it came from"""
+        self.carrying_food[index] = True
+        self.food_group_id[index] = group_id
+        self.seen_food_id[index] = -1
+        self.seen_food[index] = np.nan
+        self.steps_since_food[index] = 0
+
+    def deposit_food(self, indices, nearest=None):
+        """
+        Deposit food of the given carrying ants at their nearest ant hill
+        (`nearest` holds every ant's nearest hill when already queried)
+        """
+        indices = indices[self.carrying_food[indices]]
+        hills = self.hill_field.hills
+        if nearest is None:
+            nearest, _, _ = self.hill_field.query(self.position[indices])
+        else:
+            nearest = nearest[indices]
+        for hill, group_id in zip(nearest.tolist(), self.food_group_id[indices].tolist()):
+            hills[hill].deposit_food(group_id)
+        self.carrying_food[indices] = False
+        self.food_group_id[indices] = -1
+        self.has_last_pheromone_direction[indices] = False
+        self.steps_since_food[indices] = 0
+        self.path_memory.clear(indices)
+
+    def record_path(self, distance=None):
+        """
+        Remember the position of searching ants away from the hill, like
+        Ant.update does before moving. Kept out of update() so it also runs
+        when update() is split across worker processes. `distance` holds every
+        ant's distance to its nearest hill when already queried.
+        """
+        if distance is None:
+            _, _, distance = self.hill_field.query(self.position)
+        ants = np.flatnonzero(~self.carrying_food & (distance > 50))
+        memory = self.path_memory
+        moved = np.hypot(*(self.position[ants] - memory.last_points(ants)).T) > 10
+        ants = ants[(memory.length[ants] == 0) | moved]
+        memory.append_many(ants, self.position[ants, 0], self.position[ants, 1])
+
+    def _follow_pheromones(self, ants, to_hill):
+        """
+        Pick the best 'return' pheromone direction for each of the given ants
+        (to_hill holds every ant's offset to its nearest hill).
+        Returns the mask of ants that follow a pheromone; their base direction is
+        stored in last_pheromone_direction.
+        """
+        followed = np.zeros(self.count, dtype=bool)
+        manager = self.pheromone_manager
+        offsets, xs, ys, strengths = manager.get_nearby_batch(self.position[ants], 'return', manager.influence_radius)
+        # Same scoring as Ant.update: away from hill, stronger, keep momentum
+        directions, _, found = best_trail_directions(
+            self.position[ants], to_hill[ants], self.last_pheromone_direction[ants],
+            self.has_last_pheromone_direction[ants], offsets, xs, ys, strengths,
+            (self.trail_away_weight, self.trail_strength_weight, self.trail_momentum_weight)
+        )
+        ants = ants[found]
+        self.last_pheromone_direction[ants] = directions[found]
+        self.has_last_pheromone_direction[ants] = True
+        followed[ants] = True
+        return followed
+
+    def update(self, deltaTime, hills=None):
+        """
+        Advance every ant by one tick (same rules as Ant.update).
+        `hills` is the (nearest, to_hill, distance) result of HillField.query
+        for the current positions when the tick already queried it.
+        """
+        n = self.count
+        field = self.hill_field
+        _, to_hill, self.distance_from_hill = hills if hills is not None else field.query(self.position)
+        distance = self.distance_from_hill
+        carrying = self.carrying_food
+
+        # Deposit pheromones at regular intervals based on state
+        self.pheromone_deposit_timer += deltaTime
+        due = self.pheromone_deposit_timer >= self.pheromone_deposit_interval
+        if self.pheromone_manager is not None:
+            # Deposit RED pheromone when carrying food (successful path back)
+            drop = due & carrying & (distance > 40)
+            if drop.any():
+                self.pheromone_manager.add_pheromones(
+                    self.position[drop, 0], self.position[drop, 1], 'return', strength=3.0
+                )
+        self.pheromone_deposit_timer[due] = 0.0
+
+        # Determine desired direction based on state and pheromones
+        base_direction = np.zeros((n, 2))
+        seen = self.sees_food()
+        chasing = ~carrying & seen
+        searching = ~carrying & ~seen
+        base_direction[carrying] = _normalize(to_hill[carrying])
+        base_direction[chasing] = _normalize(self.seen_food[chasing] - self.position[chasing])
+
+        # SEARCHING: follow RED pheromones away from the ant hill, otherwise wander
+        self.steps_since_food[searching] += 1
+        followed = np.zeros(n, dtype=bool)
+        if self.pheromone_manager is not None:
+            can_follow = searching & (distance > self.min_distance_to_follow)
+            try_follow = can_follow & (self.rng.random(n) < self.pheromone_follow_probability)
+            followed = self._follow_pheromones(np.flatnonzero(try_follow), to_hill)
+            base_direction[followed] = self.last_pheromone_direction[followed]
+
+        wandering = searching & ~followed
+        self.has_last_pheromone_direction[wandering] = False
+        count = int(np.count_nonzero(wandering))
+        angle = self.rng.uniform(0, 2 * 3.14159, count)
+        radius = self.rng.uniform(0, 1, count)
+        random_direction = np.stack((np.cos(angle), np.sin(angle)), axis=1) * radius[:, None]
+        base_direction[wandering] = _normalize(
+            self.desired_direction[wandering] + random_direction * self.wander_strength[wandering, None]
+        )
+
+        # Ensure base direction is normalized for consistent speed
+        self.desired_direction = _normalize(base_direction)
+
+        # Ants carrying food move in a perfectly straight line to the ant hill
+        homing = carrying & (distance > 0)
+        self.velocity[homing] = to_hill[homing] / distance[homing, None] * self.maxSpeed
+
+        # Normal steering behavior for searching ants
+        steering = ~carrying
+        acceleration = _clamp_length(
+            self.desired_direction[steering] * self.maxSpeed - self.velocity[steering], self.steerStrength
+        )
+        self.velocity[steering] = _clamp_length(self.velocity[steering] + acceleration * deltaTime, self.maxSpeed)
+
+        self.position += self.velocity * deltaTime
+
+        # Boundary collision detection - keep ants within map
+        margin = 10  # Small margin from edge
+        for axis, limit in ((0, self.map_width), (1, self.map_height)):
+            coord, speed = self.position[:, axis], self.velocity[:, axis]
+            low, high = coord < margin, coord > limit - margin
+            coord[low] = margin
+            speed[low] = np.abs(speed[low])  # Bounce away from the low edge
+            coord[high] = limit - margin
+            speed[high] = -np.abs(speed[high])  # Bounce away from the high edge
+
+        # Collision detection with the nearest ant hill - push ants back outside
+        nearest, to_hill, distance_to_hill = field.query(self.position)
+        radius = field.radii[nearest]
+        inside = (distance_to_hill < radius) & (distance_to_hill > 0)
+        direction_from_hill = -to_hill[inside] / distance_to_hill[inside, None]
+        self.position[inside] = field.centers[nearest[inside]] + direction_from_hill * radius[inside, None]
+        self.velocity[inside] = direction_from_hill * self.maxSpeed * 0.5
+
+        moving = (self.velocity[:, 0] != 0) | (self.velocity[:, 1] != 0)
+        self.rotation[moving] = -np.degrees(np.arctan2(self.velocity[moving, 1], self.velocity[moving, 0]))
+
+    def draw(self, screen):
+        """Draw every ant with one batched blit of cached sprites"""
+        ANT_SPRITES.draw(screen, self.position, self.rotation, self.carrying_food, self.scale)
+
+
+# Swarm attributes of the behaviour constants read and set its AntSpecies, like Ant's
+for _name in Swarm.SETTINGS:
+    setattr(Swarm, _name, _species_attribute(_name))
+del _name
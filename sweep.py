@@ -0,0 +1,118 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from simulation import Simulation
+
+# Swept parameters set on the Simulation when it is created
+SIMULATION_PARAMETERS = ('evaporation_rate', 'influence_radius', 'merge_radius')
+# Swept parameters set on every ant after creation
+ANT_PARAMETERS = ('pheromone_follow_probability', 'pheromone_influence_weight', 'wanderStrength',
+                  'trail_away_weight', 'trail_strength_weight', 'trail_momentum_weight')
+GROUP_COUNT = 5
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a parameter sweep of headless simulations on all cores")
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=V1,V2,...',
+                        help="values of one swept parameter (repeatable), one of: "
+                             + ', '.join(SIMULATION_PARAMETERS + ANT_PARAMETERS))
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2], help="seeds run for every parameter set")
+    parser.add_argument('--ticks', type=int, default=3000, help="ticks per run")
+    parser.add_argument('--dt', type=float, default=1 / 60, help="fixed timestep in seconds")
+    parser.add_argument('--sample-every', type=int, default=60, help="ticks between statistics samples")
+    parser.add_argument('--ants', type=int, default=75, help="number of ants")
+    parser.add_argument('--food', type=int, default=1500, help="total number of food items")
+    parser.add_argument('--pheromones', choices=('points', 'field'), default='points', help="pheromone backend")
+    parser.add_argument('--engine', choices=('ants', 'swarm'), default='ants', help="ant engine")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--output', default='sweep_results.csv', help="where to write the results table")
+    return parser.parse_args(argv)
+
+
+def parse_grid(specs):
+    """Turn ['name=v1,v2', ...] into {name: [v1, v2]}"""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        if name not in SIMULATION_PARAMETERS + ANT_PARAMETERS or not values:
+            raise ValueError(f"invalid sweep parameter: {spec!r}")
+        grid[name] = [float(value) for value in values.split(',')]
+    return grid
+
+
+def build_runs(grid, seeds, args):
+    """Get one run description per (parameter set, seed) combination"""
+    names = list(grid)
+    runs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        for seed in seeds:
+            runs.append({
+                'run_id': len(runs),
+                'seed': seed,
+                'parameters': dict(zip(names, values)),
+                'ticks': args.ticks,
+                'dt': args.dt,
+                'sample_every': args.sample_every,
+                'ants': args.ants,
+                'food': args.food,
+                'pheromones': args.pheromones,
+                'engine': args.engine
+            })
+    return runs
+
+
+def run_one(run):
+    """Run one headless simulation (in a worker process) and return its statistics rows"""
+    parameters = run['parameters']
+    simulation = Simulation(ant_count=run['ants'], food_count=run['food'], pheromone_mode=run['pheromones'],
+                            engine=run['engine'], seed=run['seed'],
+                            **{name: parameters[name] for name in SIMULATION_PARAMETERS if name in parameters})
+    for name in ANT_PARAMETERS:
+        if name in parameters:
+            simulation.set_ant_parameter(name, parameters[name])
+
+    rows = []
+    def sample():
+        stats = simulation.ant_hill.get_statistics()
+        row = {'run_id': run['run_id'], 'seed': run['seed'], **parameters,
+               'tick': simulation.ticks, 'time': simulation.time, 'total': stats['total']}
+        for group_id in range(GROUP_COUNT):
+            row[f'group_{group_id}'] = stats['by_group'].get(group_id, 0)
+        rows.append(row)
+
+    sample()
+    while simulation.ticks < run['ticks']:
+        simulation.run(min(run['sample_every'], run['ticks'] - simulation.ticks), run['dt'])
+        sample()
+    return rows
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    grid = parse_grid(args.param)
+    runs = build_runs(grid, args.seeds, args)
+    workers = args.workers or os.cpu_count()
+    print(f"{len(runs)} runs of {args.ticks} ticks on {workers} workers")
+
+    start = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for run, run_rows in zip(runs, executor.map(run_one, runs)):
+            rows.extend(run_rows)
+            print(f"run {run['run_id']:>4} seed {run['seed']:>4} {run['parameters']} -> total {run_rows[-1]['total']}")
+    elapsed = time.perf_counter() - start
+
+    fields = ['run_id', 'seed', *grid, 'tick', 'time', 'total'] + [f'group_{i}' for i in range(GROUP_COUNT)]
+    with open(args.output, 'w', newline='') as output_file:
+        writer = csv.DictWriter(output_file, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"{len(rows)} rows written to {args.output} in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
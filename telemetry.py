@@ -0,0 +1,336 @@
+import json
+import mmap
+import queue
+import struct
+import threading
+import numpy as np
+
+# File layout (all little-endian):
+#   MAGIC
+#   chunk*             CHUNK_HEADER (tag, header length, payload length), JSON header, payload
+#   [index chunk]      written by close(): offsets and ticks of every frame chunk
+#   [TRAILER]          TRAILER_TAG + offset of the index chunk
+# Payloads are raw array bytes, 8-byte aligned in the file, so a reader can
+# memory-map the file and view every array in place without copying.
+MAGIC = b'ANTREC01'
+CHUNK_TAG = b'CHNK'
+CHUNK_HEADER = struct.Struct('<4sIQ')
+TRAILER = struct.Struct('<8sQ')
+TRAILER_TAG = b'ANTIDX01'
+
+def _chunk_parts(kind, meta, arrays, offset):
+    """Serialize one chunk starting at a file offset, returns its byte parts and total size"""
+    layout = []
+    payload = []
+    size = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        padding = -size % 8
+        if padding:
+            payload.append(b'\0' * padding)
+            size += padding
+        layout.append({'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': size})
+        payload.append(array.tobytes())
+        size += array.nbytes
+
+    header = json.dumps({'kind': kind, 'meta': meta, 'arrays': layout}).encode()
+    # Pad the JSON header so the payload starts 8-byte aligned
+    header += b' ' * (-(offset + CHUNK_HEADER.size + len(header)) % 8)
+    return [CHUNK_HEADER.pack(CHUNK_TAG, len(header), size), header] + payload, CHUNK_HEADER.size + len(header) + size
+
+
+def capture_static(simulation):
+    """Get the parts of a simulation that never change during a run (food layout, hill, config)"""
+    index = simulation.food_index
+    hill = simulation.ant_hill
+    meta = {
+        'config': simulation.config,
+        'hill': [hill.position.x, hill.position.y, hill.radius],
+        'group_ids': [group.group_id for group in simulation.food_groups]
+    }
+    arrays = {
+        'food_x': index.x.astype(np.float32),
+        'food_y': index.y.astype(np.float32),
+        'food_group': index.group_ids.astype(np.int16)
+    }
+    return meta, arrays
+
+
+def capture_frame(simulation, previous_stats=None, include_pheromones=True):
+    """
+    Get the current state of a simulation as (meta, arrays): ant positions,
+    rotations and carrying flags, remaining food, pheromones, hill statistics
+    and their change since previous_stats
+    """
+    manager = simulation.pheromone_manager
+    stats = simulation.ant_hill.get_statistics()
+    previous = previous_stats or {'total': 0, 'by_group': {}}
+    meta = {
+        'tick': simulation.ticks,
+        'time': simulation.time,
+        'total': stats['total'],
+        'by_group': {str(group): count for group, count in stats['by_group'].items()},
+        'delta_total': stats['total'] - previous['total'],
+        'delta_by_group': {str(group): count - previous['by_group'].get(group, 0)
+                           for group, count in stats['by_group'].items()},
+        'pheromone_types': list(manager.type_names),
+        'pheromone_counts': {name: manager.get_count_by_type(name) for name in manager.type_names}
+    }
+
+    if simulation.swarm is not None:
+        swarm = simulation.swarm
+        positions, rotations, carrying = swarm.position, swarm.rotation, swarm.carrying_food
+    else:
+        ants = simulation.ants
+        positions = np.array([(ant.position.x, ant.position.y) for ant in ants]).reshape(-1, 2)
+        rotations = np.array([ant.rotation for ant in ants])
+        carrying = np.array([ant.carrying_food for ant in ants], dtype=bool)
+    arrays = {
+        'ant_position': positions.astype(np.float32),
+        'ant_rotation': rotations.astype(np.float32),
+        'ant_carrying': carrying.astype(bool),
+        'food_alive': simulation.food_index.alive.copy()
+    }
+
+    if include_pheromones:
+        state = manager.get_state()
+        if 'grids' in state:
+            arrays['pheromone_grids'] = state['grids'].astype(np.float32)
+        else:
+            # Evaporated strengths, no deposit times
+            state['strength'] = state['strength'] - manager.evaporation_rate * (manager.time - state['deposit_time'])
+            for name in manager.ARRAYS:
+                array = state[name]
+                arrays['pheromone_' + name] = array if array.dtype == np.int8 else array.astype(np.float32)
+    return meta, arrays
+
+
+class TelemetryWriter:
+    """
+    Streams simulation frames to an append-only chunked binary file.
+    record() is called after every tick and copies the state every `every`
+    ticks; a background thread serializes and writes the frames, so the
+    simulation loop never waits on the disk. close() flushes the queue and
+    appends an index of all frames, which lets TelemetryReader open even
+    very large recordings instantly (recordings that were not closed are
+    still readable, the reader then scans the chunk headers).
+    At most max_queued frames wait for the writer. When the disk falls
+    behind, the oldest waiting frame is dropped (counted in dropped_frames)
+    unless block=True, which makes record() wait instead. The delta fields
+    of a frame are relative to the previous captured frame, dropped or not.
+    """
+    def __init__(self, path, simulation, every=10, include_pheromones=True, max_queued=64, block=False):
+        self.path = path
+        self.every = max(1, every)
+        self.include_pheromones = include_pheromones
+        self.block = block
+        self.previous_stats = None
+        self.frame_offsets = []
+        self.frame_ticks = []
+        self.dropped_frames = 0
+        self.error = None
+
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.offset = len(MAGIC)
+        # The static chunk is written before the thread starts, so only frames are ever dropped
+        self._write_chunk('static', *capture_static(simulation))
+        self.queue = queue.Queue(maxsize=max(1, max_queued))
+        self.thread = threading.Thread(target=self._write_loop, name='telemetry-writer', daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def record(self, simulation):
+        """Queue a frame of the simulation if this tick is due"""
+        if simulation.ticks % self.every:
+            return
+        stats = simulation.ant_hill.get_statistics()
+        meta, arrays = capture_frame(simulation, self.previous_stats, self.include_pheromones)
+        self.previous_stats = stats
+        if self.block:
+            self.queue.put(('frame', meta, arrays))
+            return
+        while True:
+            try:
+                self.queue.put_nowait(('frame', meta, arrays))
+                return
+            except queue.Full:
+                pass
+            # Make room by dropping the oldest waiting frame (the writer may have just taken it)
+            try:
+                self.queue.get_nowait()
+                self.dropped_frames += 1
+            except queue.Empty:
+                pass
+
+    def _write_chunk(self, kind, meta, arrays):
+        """Append one chunk to the file (writer thread only)"""
+        parts, size = _chunk_parts(kind, meta, arrays, self.offset)
+        if kind == 'frame':
+            self.frame_offsets.append(self.offset)
+            self.frame_ticks.append(meta['tick'])
+        self.file.writelines(parts)
+        self.offset += size
+
+    def _write_loop(self):
+        """Write queued chunks until close() sends None"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is None:
+                try:
+                    self._write_chunk(*item)
+                except Exception as error:
+                    self.error = error
+
+    def close(self):
+        """Write all queued frames and the frame index, then close the file"""
+        if self.file.closed:
+            return
+        self.queue.put(None)  # Blocks only until the writer takes a frame
+        self.thread.join()
+        if self.error is None:
+            index_offset = self.offset
+            self._write_chunk('index', {}, {
+                'offsets': np.array(self.frame_offsets, dtype=np.int64),
+                'ticks': np.array(self.frame_ticks, dtype=np.int64)
+            })
+            self.file.write(TRAILER.pack(TRAILER_TAG, index_offset))
+        self.file.close()
+        if self.error is not None:
+            raise self.error
+
+
+class Frame:
+    """One recorded frame: its meta data and arrays (views into the mapped file)"""
+    __slots__ = ('meta', 'arrays')
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.arrays = arrays
+
+    @property
+    def tick(self):
+        return self.meta['tick']
+
+    @property
+    def time(self):
+        return self.meta['time']
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+
+class TelemetryReader:
+    """
+    Lazily reads a recording written by TelemetryWriter.
+    The file is memory-mapped and only the small chunk headers are parsed on
+    access; arrays are views into the mapping, so opening and seeking cost
+    the same for any recording size.
+    """
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a telemetry recording")
+
+        static, next_offset = self._read_chunk(len(MAGIC))
+        self.static = Frame(static['meta'], static['arrays'])
+        self.config = static['meta']['config']
+
+        index = self._read_index()
+        if index is not None:
+            self.offsets = index['offsets'].copy()
+            self.ticks = index['ticks'].copy()
+        else:
+            self.offsets, self.ticks = self._scan(next_offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        chunk, _ = self._read_chunk(int(self.offsets[i]))
+        return Frame(chunk['meta'], chunk['arrays'])
+
+    def __iter__(self):
+        return self.frames()
+
+    def frames(self, start=0, stop=None, step=1):
+        """Iterate over frames lazily, one chunk at a time"""
+        for i in range(*slice(start, stop, step).indices(len(self))):
+            yield self[i]
+
+    def frame_at_tick(self, tick):
+        """Get the index of the last frame recorded at or before a tick"""
+        return max(0, int(np.searchsorted(self.ticks, tick, side='right')) - 1)
+
+    def _read_chunk(self, offset):
+        """Parse the chunk at an offset, returns ({'kind', 'meta', 'arrays'}, offset of the next chunk)"""
+        tag, header_length, payload_length = CHUNK_HEADER.unpack_from(self.map, offset)
+        if tag != CHUNK_TAG:
+            raise ValueError(f"corrupt recording: no chunk at offset {offset}")
+        start = offset + CHUNK_HEADER.size
+        header = json.loads(self.map[start:start + header_length])
+        payload = start + header_length
+        arrays = {}
+        for entry in header['arrays']:
+            dtype = np.dtype(entry['dtype'])
+            shape = tuple(entry['shape'])
+            count = int(np.prod(shape, dtype=np.int64))
+            arrays[entry['name']] = np.frombuffer(self.map, dtype, count, payload + entry['offset']).reshape(shape)
+        chunk = {'kind': header['kind'], 'meta': header['meta'], 'arrays': arrays}
+        return chunk, payload + payload_length
+
+    def _read_index(self):
+        """Get the frame index written by close(), or None"""
+        if len(self.map) < TRAILER.size:
+            return None
+        tag, index_offset = TRAILER.unpack_from(self.map, len(self.map) - TRAILER.size)
+        if tag != TRAILER_TAG:
+            return None
+        chunk, _ = self._read_chunk(index_offset)
+        return chunk['arrays']
+
+    def _scan(self, offset):
+        """Find the frame chunks by walking the chunk headers (for recordings that were not closed)"""
+        offsets = []
+        ticks = []
+        end = len(self.map)
+        while offset + CHUNK_HEADER.size <= end:
+            tag, header_length, payload_length = CHUNK_HEADER.unpack_from(self.map, offset)
+            next_offset = offset + CHUNK_HEADER.size + header_length + payload_length
+            if tag != CHUNK_TAG or next_offset > end:
+                break  # Truncated last chunk
+            start = offset + CHUNK_HEADER.size
+            header = json.loads(self.map[start:start + header_length])
+            if header['kind'] == 'frame':
+                offsets.append(offset)
+                ticks.append(header['meta']['tick'])
+            offset = next_offset
+        return np.array(offsets, dtype=np.int64), np.array(ticks, dtype=np.int64)
+
+    def close(self):
+        """Unmap and close the file (frames still referenced keep the mapping alive)"""
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # Arrays of returned frames still view the mapping
+        self.file.close()
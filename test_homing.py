@@ -0,0 +1,75 @@
+import math
+import random
+import numpy as np
+import pytest
+from ant import Ant, AntSpecies
+from anthill import AntHill
+from homing import HomingTrips
+from pheromone import PheromoneManager
+from simulation import Simulation
+
+HILL = (500, 400, 40)
+
+
+def walk_per_tick(start, deltaTime, timer):
+    """Walk a carrying ant home with Ant.update until it is within 50 px of the hill, like Simulation"""
+    species = AntSpecies()
+    ant = Ant(*start, species=species)
+    ant.set_ant_hill(AntHill(*HILL))
+    ant.set_pheromone_manager(PheromoneManager(evaporation_rate=0))
+    ant.pickup_food(0)
+    ant.pheromone_deposit_timer = timer
+    ticks = 0
+    while (ant.position - ant.ant_hill.position).length() >= 50:
+        ant.update(deltaTime)
+        ticks += 1
+    manager = ant.pheromone_manager
+    drops = list(zip(manager.x[:manager.count].tolist(), manager.y[:manager.count].tolist()))
+    return ticks, drops, ant
+
+
+def walk_trip(start, deltaTime, timer):
+    """Walk the same ant home as a HomingTrips trip"""
+    species = AntSpecies()
+    trips = HomingTrips(1)
+    arrival = trips.begin(0, start, HILL[:2], HILL[2], species.maxSpeed, deltaTime, timer,
+                          species.pheromone_deposit_interval)
+    drops = []
+    for _ in range(arrival):
+        tick_drops, _, _ = trips.advance()
+        drops.extend(map(tuple, tick_drops.tolist()))
+    assert trips.arrived().tolist() == [0]
+    return arrival, drops, trips.finish(0)
+
+
+@pytest.mark.parametrize('deltaTime', [1 / 120, 1 / 60, 1 / 30, 0.1, 0.2])
+def test_trip_matches_per_tick_path(deltaTime):
+    rng = random.Random(7)
+    for _ in range(30):
+        start = (rng.uniform(20, 980), rng.uniform(20, 980))
+        if math.hypot(start[0] - HILL[0], start[1] - HILL[1]) < 50:
+            continue
+        timer = rng.uniform(0, 0.1)
+        ticks, drops, ant = walk_per_tick(start, deltaTime, timer)
+        arrival, trip_drops, (position, velocity, trip_timer, distance) = walk_trip(start, deltaTime, timer)
+
+        assert arrival == ticks
+        np.testing.assert_allclose(np.reshape(trip_drops, (-1, 2)), np.reshape(drops, (-1, 2)), rtol=0, atol=1e-6)
+        np.testing.assert_allclose(position, (ant.position.x, ant.position.y), rtol=0, atol=1e-6)
+        np.testing.assert_allclose(velocity, (ant.velocity.x, ant.velocity.y), rtol=0, atol=1e-6)
+        assert trip_timer == pytest.approx(ant.pheromone_deposit_timer, abs=1e-9)
+        assert distance == pytest.approx(ant.distance_from_hill, abs=1e-6)
+
+
+@pytest.mark.parametrize('deltaTime', [0.25, 0.5, 0.0, -0.1])
+def test_no_trip_without_closed_form(deltaTime):
+    trips = HomingTrips(1)
+    assert trips.begin(0, (420, 440), (580, 440), 40, 420, deltaTime, 0.0, 0.1) is None
+    assert not trips.active.any()
+
+
+@pytest.mark.parametrize('deltaTime', [1 / 60, 0.25, 0.5])
+def test_large_steps_use_per_tick_path(deltaTime):
+    simulation = Simulation(ant_count=40, seed=2)
+    simulation.run(200, deltaTime)
+    assert simulation.ant_hill.total_food_collected > 0
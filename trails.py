@@ -0,0 +1,56 @@
+import numpy as np
+
+# Default weights of the trail score: away from the hill, pheromone strength, momentum
+TRAIL_WEIGHTS = (2.0, 0.3, 0.5)
+
+def best_trail_directions(positions, to_hill, last_directions, has_last, offsets, xs, ys, strengths,
+                          weights=TRAIL_WEIGHTS, min_distance=5):
+    """
+    Pick the best 'return' pheromone direction of many searching ants at once.
+    The candidates of ant i are entries offsets[i]:offsets[i + 1] of xs, ys and
+    strengths (a CSR-style ant -> neighbour list, see get_nearby_batch).
+    Every candidate farther than min_distance is scored like in Ant.update:
+    away_weight * (how much it leads away from the hill) + strength_weight *
+    strength + momentum_weight * (agreement with the ant's last followed
+    direction, for ants with has_last). Ties go to the first candidate.
+    Returns (directions, scores, found): the best unit direction and its score
+    per ant, and the mask of ants whose best score is above 0 (the ones that
+    follow a trail).
+    """
+    count = len(positions)
+    away_weight, strength_weight, momentum_weight = weights
+    directions = np.zeros((count, 2))
+    scores = np.full(count, -np.inf)
+    owner = np.repeat(np.arange(count), np.diff(offsets))
+
+    # Lengths as sqrt(x * x + y * y), like Vector2.length, so the selection matches Ant.update exactly
+    dx = xs - positions[owner, 0]
+    dy = ys - positions[owner, 1]
+    distance = np.sqrt(dx * dx + dy * dy)
+    far = distance > min_distance  # Ignore very close pheromones
+    owner, distance, strengths = owner[far], distance[far], strengths[far]
+    if not len(owner):
+        return directions, scores, np.zeros(count, dtype=bool)
+    dir_x, dir_y = dx[far] / distance, dy[far] / distance
+
+    hill_length = np.sqrt(to_hill[:, 0] * to_hill[:, 0] + to_hill[:, 1] * to_hill[:, 1])
+    hill_direction = to_hill / np.where(hill_length > 0, hill_length, 1.0)[:, None]
+    hill_x, hill_y = hill_direction[owner, 0], hill_direction[owner, 1]
+    last_x, last_y = last_directions[owner, 0], last_directions[owner, 1]
+
+    score = -(dir_x * hill_x + dir_y * hill_y) * away_weight + strengths * strength_weight
+    momentum = has_last[owner]
+    score[momentum] += (dir_x[momentum] * last_x[momentum] + dir_y[momentum] * last_y[momentum]) * momentum_weight
+
+    # First maximum of every ant's segment
+    starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    best_score = np.maximum.reduceat(score, starts)
+    ants = owner[starts]
+    is_best = score == np.repeat(best_score, np.diff(np.r_[starts, len(owner)]))
+    best = np.flatnonzero(is_best)
+    best = best[np.r_[True, owner[best][1:] != owner[best][:-1]]]
+
+    directions[ants, 0] = dir_x[best]
+    directions[ants, 1] = dir_y[best]
+    scores[ants] = best_score
+    return directions, scores, scores > 0